@@ -1,5 +1,6 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.express as px
 import sys
 import os
@@ -7,6 +8,19 @@ import json
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from utils.data_loader import DataLoader
 from utils.voting_system import VotingSystem
+from utils.vote_queue import vote_queues
+from utils.vote_rollups import vote_rollup, ROLLUP_INTERVALS
+from utils.s3_fetcher import FETCH_STATS
+from utils.views import rows_since
+from utils.sentiment_cube import sentiment_cube, sentiment_counts, post_count, mean_score, MISSING, UNLABELLED
+from utils.indicator_engine import indicators_by_symbol
+from utils.price_bars import price_bars, BAR_INTERVALS
+from utils.downsample import downsample
+from utils.figure_cache import cached_figure, FIGURE_CACHE_STATS
+from utils.sentiment_timeline import sentiment_timeline, window_shares, labelled_counts, needle, COINS
+from utils.term_counts import term_counts
+from utils.term_index import get_term_index
+from utils.ticker_mentions import TICKER_MATCHER, TESLA_MATCHER, STOCK_MATCHER, IPO_MATCHER, mention_index
 from dotenv import load_dotenv
 from datetime import datetime, timedelta
 from monthly_predictions_page import monthly_predictions_page
@@ -226,31 +240,35 @@ def presentation_page():
     
     # Sentiment Gauge
     if 'sentiment_label' in df.columns:
+        # Gauges and breakdowns read window counts from the cumulative timeline
+        timeline = sentiment_timeline(df)
+        
         # Calculate current sentiment percentages (last 3 days)
-        df['timestamp'] = pd.to_datetime(df['timestamp'])
-        recent_cutoff = pd.Timestamp.now() - pd.Timedelta(days=3)
-        recent_df = df[df['timestamp'] >= recent_cutoff].copy()
+        now = pd.Timestamp.now(tz='UTC')
+        recent_cutoff = now - pd.Timedelta(days=3)
+        recent_window = {'start': recent_cutoff}
+        recent_df = rows_since(df, recent_cutoff)
         
         if recent_df.empty:
             recent_df = df  # Fallback to all data
+            recent_window = {}
         
-        bullish_pct = (recent_df['sentiment_label'].isin(['4 stars', '5 stars'])).mean() * 100
-        neutral_pct = (recent_df['sentiment_label'] == '3 stars').mean() * 100
-        bearish_pct = (recent_df['sentiment_label'].isin(['1 star', '2 stars'])).mean() * 100
-        needle_value = bullish_pct + (neutral_pct * 0.3)
+        # Unlabelled posts count towards the total here
+        recent_counts = timeline.counts(**recent_window)
+        recent_shares = window_shares(recent_counts, include_unlabelled=True)
+        bullish_pct = recent_shares['Bullish']
+        neutral_pct = recent_shares['Neutral']
+        bearish_pct = recent_shares['Bearish']
+        needle_value = needle(recent_shares)
         
         # Calculate last week sentiment for comparison (only if we have enough data)
-        week_ago_cutoff = pd.Timestamp.now() - pd.Timedelta(days=10)
-        last_week_cutoff = pd.Timestamp.now() - pd.Timedelta(days=3)
-        last_week_df = df[(df['timestamp'] >= week_ago_cutoff) & (df['timestamp'] < last_week_cutoff)].copy()
+        last_week_counts = timeline.counts(start=now - pd.Timedelta(days=10), end=recent_cutoff)
         
         show_delta = False
         last_week_needle = None
         
-        if not last_week_df.empty and len(last_week_df) >= 10:  # Need at least 10 data points
-            last_week_bullish = (last_week_df['sentiment_label'].isin(['4 stars', '5 stars'])).mean() * 100
-            last_week_neutral = (last_week_df['sentiment_label'] == '3 stars').mean() * 100
-            last_week_needle = last_week_bullish + (last_week_neutral * 0.5)
+        if last_week_counts.sum() >= 10:  # Need at least 10 data points
+            last_week_needle = needle(window_shares(last_week_counts, include_unlabelled=True))
             show_delta = True
         
         st.subheader("🌡️ Market Sentiment Gauge")
@@ -337,8 +355,8 @@ def presentation_page():
             st.metric("Bearish", f"{bearish_pct:.0f}%")
         with col4:
             if 'platform' in recent_df.columns:
-                bluesky_count = len(recent_df[recent_df['platform'] == 'bluesky'])
-                reddit_count = len(recent_df[recent_df['platform'].isna() | (recent_df['platform'] != 'bluesky')])
+                bluesky_count = timeline.counts(('platform', 'bluesky'), **recent_window).sum()
+                reddit_count = recent_counts.sum() - bluesky_count
                 st.metric("Data Sources", f"R:{reddit_count} B:{bluesky_count}")
             else:
                 latest_data = recent_df['timestamp'].max().strftime('%Y-%m-%d') if 'timestamp' in recent_df.columns else 'N/A'
@@ -376,42 +394,41 @@ def presentation_page():
         # Platform comparison (expandable)
         with st.expander("🔄 Platform Comparison (Reddit vs Bluesky)"):
             if 'platform' in recent_df.columns:
-                # Create sentiment_category column for platform comparison
-                recent_df['sentiment_category'] = recent_df['sentiment_label'].map({
-                    '1 star': 'Bearish', '2 stars': 'Bearish', '3 stars': 'Neutral',
-                    '4 stars': 'Bullish', '5 stars': 'Bullish'
-                })
-                
                 # Debug info
-                st.write(f"**Debug**: Total recent posts: {len(recent_df)}")
-                platform_counts = recent_df['platform'].value_counts(dropna=False)
+                st.write(f"**Debug**: Total recent posts: {recent_counts.sum()}")
+                platform_counts = pd.Series({
+                    platform: timeline.counts(('platform', platform), **recent_window).sum()
+                    for platform in sorted(timeline.groups('platform'))
+                }, dtype='int64').sort_values(ascending=False, kind='stable')
+                platform_counts = platform_counts[platform_counts > 0]
+                platform_counts.index = platform_counts.index.map(lambda name: np.nan if name == MISSING else name)
                 st.write(f"**Platform breakdown**: {dict(platform_counts)}")
                 
-                # Separate Reddit and Bluesky data
-                reddit_data = recent_df[recent_df['platform'].isna() | (recent_df['platform'] != 'bluesky')]
-                bluesky_data = recent_df[recent_df['platform'] == 'bluesky']
+                # Separate Reddit and Bluesky data (posts without a platform are Reddit)
+                bluesky_counts = timeline.counts(('platform', 'bluesky'), **recent_window)
+                reddit_counts = recent_counts - bluesky_counts
                 
                 col1, col2 = st.columns(2)
                 
                 with col1:
                     st.subheader("🟠 Reddit")
-                    if not reddit_data.empty:
-                        reddit_sentiment = reddit_data['sentiment_category'].value_counts(normalize=True) * 100
+                    if reddit_counts.sum():
+                        reddit_sentiment = window_shares(reddit_counts)
                         st.write(f"🟢 Bullish: {reddit_sentiment.get('Bullish', 0):.0f}%")
                         st.write(f"⚪ Neutral: {reddit_sentiment.get('Neutral', 0):.0f}%")
                         st.write(f"🔴 Bearish: {reddit_sentiment.get('Bearish', 0):.0f}%")
-                        st.caption(f"{len(reddit_data)} posts analyzed")
+                        st.caption(f"{reddit_counts.sum()} posts analyzed")
                     else:
                         st.info("No Reddit data")
                 
                 with col2:
                     st.subheader("🦋 Bluesky")
-                    if not bluesky_data.empty:
-                        bluesky_sentiment = bluesky_data['sentiment_category'].value_counts(normalize=True) * 100
+                    if bluesky_counts.sum():
+                        bluesky_sentiment = window_shares(bluesky_counts)
                         st.write(f"🟢 Bullish: {bluesky_sentiment.get('Bullish', 0):.0f}%")
                         st.write(f"⚪ Neutral: {bluesky_sentiment.get('Neutral', 0):.0f}%")
                         st.write(f"🔴 Bearish: {bluesky_sentiment.get('Bearish', 0):.0f}%")
-                        st.caption(f"{len(bluesky_data)} posts analyzed")
+                        st.caption(f"{bluesky_counts.sum()} posts analyzed")
                     else:
                         st.info("No Bluesky data in recent timeframe")
             else:
@@ -421,66 +438,28 @@ def presentation_page():
         with st.expander("📊 Detailed Category Breakdown (Last 3 Days)"):
             if 'category' in df.columns:
                 # Filter to recent data only
-                df['timestamp'] = pd.to_datetime(df['timestamp'])
-                recent_cutoff = pd.Timestamp.now() - pd.Timedelta(days=3)
-                recent_df = df[df['timestamp'] >= recent_cutoff].copy()
+                breakdown_window = {'start': recent_cutoff}
                 
-                if recent_df.empty:
+                if timeline.counts(start=recent_cutoff).sum() == 0:
                     st.warning("No recent data (last 3 days) available for current sentiment analysis.")
-                    recent_df = df  # Fall back to all data if no recent data
-                
-                # Create bullish/bearish categories
-                recent_df['sentiment_category'] = recent_df['sentiment_label'].map({
-                    '1 star': 'Bearish', '2 stars': 'Bearish', '3 stars': 'Neutral',
-                    '4 stars': 'Bullish', '5 stars': 'Bullish'
-                })
-                
-                # Extract crypto-specific sentiment by detecting coin mentions
-                def get_crypto_breakdown(df):
-                    import re
-                    crypto_data = {'BTC': [], 'ETH': [], 'XMR': [], 'LTC': [], 'OTHER_CRYPTO': []}
-                    
-                    for _, row in df[df['category'] == 'CRYPTO'].iterrows():
-                        text = f"{row.get('title', '')} {row.get('content', '')} {row.get('subreddit', '')}".lower()
-                        
-                        # Check for specific coin mentions
-                        if any(term in text for term in ['bitcoin', 'btc', 'r/bitcoin', 'r/btc', 'bitcoinmarkets']):
-                            crypto_data['BTC'].append(row)
-                        elif any(term in text for term in ['ethereum', 'eth', 'r/ethereum', 'r/ethtrader', 'r/ethfinance']):
-                            crypto_data['ETH'].append(row)
-                        elif any(term in text for term in ['monero', 'xmr', 'r/monero', 'r/xmrtrader']):
-                            crypto_data['XMR'].append(row)
-                        elif any(term in text for term in ['litecoin', 'ltc', 'r/litecoin', 'r/litecoinmarkets']):
-                            crypto_data['LTC'].append(row)
-                        else:
-                            crypto_data['OTHER_CRYPTO'].append(row)
-                    
-                    return crypto_data
-                
-                crypto_breakdown = get_crypto_breakdown(recent_df)
+                    breakdown_window = {}  # Fall back to all data if no recent data
                 
-                # Calculate sentiment for each crypto
+                # Crypto-specific sentiment: each CRYPTO post is attributed to one coin;
+                # posts without a sentiment label are counted but not in the percentages
                 crypto_sentiments = {}
-                for crypto, posts in crypto_breakdown.items():
-                    if posts:
-                        crypto_df = pd.DataFrame(posts)
-                        crypto_df['sentiment_category'] = crypto_df['sentiment_label'].map({
-                            '1 star': 'Bearish', '2 stars': 'Bearish', '3 stars': 'Neutral',
-                            '4 stars': 'Bullish', '5 stars': 'Bullish'
-                        })
-                        sentiment_counts = crypto_df['sentiment_category'].value_counts(normalize=True) * 100
-                        bullish = sentiment_counts.get('Bullish', 0)
-                        neutral = sentiment_counts.get('Neutral', 0)
-                        bearish = sentiment_counts.get('Bearish', 0)
-                        crypto_sentiments[crypto] = {
-                            'bullish': bullish, 'neutral': neutral, 'bearish': bearish,
-                            'needle': bullish + (neutral * 0.5), 'count': len(posts)
-                        }
+                for coin in COINS:
+                    coin_counts = timeline.counts(('coin', coin), **breakdown_window)
+                    if coin_counts.sum() > 0:
+                        crypto_sentiments[coin] = {'shares': window_shares(coin_counts), 'count': coin_counts.sum()}
                 
-                # Non-crypto categories
-                non_crypto_df = recent_df[recent_df['category'] != 'CRYPTO']
-                category_sentiment = non_crypto_df.groupby(['category', 'sentiment_category']).size().unstack(fill_value=0)
-                category_sentiment_pct = category_sentiment.div(category_sentiment.sum(axis=1), axis=0) * 100
+                # Non-crypto categories with labelled posts
+                category_sentiment_pct = {}
+                for category in sorted(timeline.groups('category')):
+                    if category in ('CRYPTO', MISSING):
+                        continue
+                    category_counts = timeline.counts(('category', category), **breakdown_window)
+                    if labelled_counts(category_counts).sum() > 0:
+                        category_sentiment_pct[category] = window_shares(category_counts)
                 
                 # Category descriptions
                 st.markdown("""
@@ -496,40 +475,34 @@ def presentation_page():
                 # Display crypto breakdown first
                 if crypto_sentiments:
                     st.markdown("**🪙 Cryptocurrency Breakdown**")
-                    crypto_cols = st.columns(len([k for k, v in crypto_sentiments.items() if v['count'] > 0]))
-                    col_idx = 0
+                    crypto_cols = st.columns(len(crypto_sentiments))
                     
-                    for crypto, sentiment in crypto_sentiments.items():
-                        if sentiment['count'] > 0:
-                            with crypto_cols[col_idx]:
-                                fig_crypto = create_sentiment_gauge(
-                                    value=sentiment['needle'],
-                                    title=crypto,
-                                    size='mini'
-                                )
-                                st.plotly_chart(fig_crypto, use_container_width=True)
-                                st.caption(f"🟢 {sentiment['bullish']:.0f}% • ⚪ {sentiment['neutral']:.0f}% • 🔴 {sentiment['bearish']:.0f}%")
-                                st.caption(f"{sentiment['count']} posts")
-                            col_idx += 1
+                    for col_idx, (crypto, sentiment) in enumerate(crypto_sentiments.items()):
+                        coin_shares = sentiment['shares']
+                        with crypto_cols[col_idx]:
+                            fig_crypto = create_sentiment_gauge(
+                                value=needle(coin_shares),
+                                title=crypto,
+                                size='mini'
+                            )
+                            st.plotly_chart(fig_crypto, use_container_width=True)
+                            st.caption(f"🟢 {coin_shares['Bullish']:.0f}% • ⚪ {coin_shares['Neutral']:.0f}% • 🔴 {coin_shares['Bearish']:.0f}%")
+                            st.caption(f"{sentiment['count']} posts")
                 
                 # Display other categories
-                if not category_sentiment_pct.empty:
+                if category_sentiment_pct:
                     st.markdown("**📊 Other Categories**")
-                    other_cols = st.columns(len(category_sentiment_pct.index))
+                    other_cols = st.columns(len(category_sentiment_pct))
                     
-                    for i, category in enumerate(category_sentiment_pct.index):
+                    for i, (category, cat_shares) in enumerate(category_sentiment_pct.items()):
                         with other_cols[i]:
-                            cat_bullish = category_sentiment_pct.loc[category, 'Bullish'] if 'Bullish' in category_sentiment_pct.columns else 0
-                            cat_neutral = category_sentiment_pct.loc[category, 'Neutral'] if 'Neutral' in category_sentiment_pct.columns else 0
-                            cat_needle = cat_bullish + (cat_neutral * 0.5)
-                            
                             fig_cat = create_sentiment_gauge(
-                                value=cat_needle,
+                                value=needle(cat_shares),
                                 title=category,
                                 size='mini'
                             )
                             st.plotly_chart(fig_cat, use_container_width=True)
-                            st.caption(f"🟢 {cat_bullish:.0f}% • ⚪ {cat_neutral:.0f}% • 🔴 {category_sentiment_pct.loc[category, 'Bearish'] if 'Bearish' in category_sentiment_pct.columns else 0:.0f}%")
+                            st.caption(f"🟢 {cat_shares['Bullish']:.0f}% • ⚪ {cat_shares['Neutral']:.0f}% • 🔴 {cat_shares['Bearish']:.0f}%")
     
     st.markdown("---")
     
@@ -538,60 +511,31 @@ def presentation_page():
     
     # Extract ticker mentions from recent data
     if not recent_df.empty:
-        import re
-        
-        def extract_tickers(text):
-            if not isinstance(text, str):
-                return []
-            # Look for $TICKER or standalone TICKER patterns
-            patterns = [r'\$([A-Z]{2,5})\b', r'\b([A-Z]{2,5})\b']
-            tickers = []
-            for pattern in patterns:
-                matches = re.findall(pattern, text.upper())
-                tickers.extend(matches)
-            # Filter common words and focus on likely tickers
-            valid_tickers = ['GME', 'AMC', 'TSLA', 'AAPL', 'NVDA', 'MSFT', 'BTC', 'ETH', 'DOGE', 'SHIB', 'SPY', 'QQQ']
-            return [t for t in tickers if t in valid_tickers]
-        
-        # Count ticker mentions
-        ticker_mentions = {}
-        for _, row in recent_df.iterrows():
-            text = f"{row.get('title', '')} {row.get('content', '')}"
-            tickers = extract_tickers(text)
-            for ticker in tickers:
-                ticker_mentions[ticker] = ticker_mentions.get(ticker, 0) + 1
-        
-        if ticker_mentions:
-            # Sort by mentions and show top 6
-            top_tickers = sorted(ticker_mentions.items(), key=lambda x: x[1], reverse=True)[:6]
+        # One regex pass over all posts, then one groupby for counts and sentiment
+        ticker_summary = TICKER_MATCHER.summary(recent_df)
+        
+        if not ticker_summary.empty:
+            # Show the top 6 by mentions
+            top_tickers = ticker_summary.head(6)
             
             cols = st.columns(3)
-            for i, (ticker, mentions) in enumerate(top_tickers):
+            for i, row in enumerate(top_tickers.itertuples()):
                 with cols[i % 3]:
-                    # Calculate sentiment for this ticker
-                    ticker_posts = []
-                    for _, row in recent_df.iterrows():
-                        text = f"{row.get('title', '')} {row.get('content', '')}"
-                        if ticker in extract_tickers(text):
-                            ticker_posts.append(row)
+                    bullish_pct = row.bullish_pct
                     
-                    if ticker_posts:
-                        ticker_df = pd.DataFrame(ticker_posts)
-                        bullish_pct = (ticker_df['sentiment_label'].isin(['4 stars', '5 stars'])).mean() * 100
-                        
-                        # Color based on sentiment
-                        if bullish_pct >= 60:
-                            sentiment_color = "🟢"
-                        elif bullish_pct >= 40:
-                            sentiment_color = "🟡"
-                        else:
-                            sentiment_color = "🔴"
-                        
-                        st.metric(
-                            f"{sentiment_color} ${ticker}",
-                            f"{mentions} mentions",
-                            f"{bullish_pct:.0f}% bullish"
-                        )
+                    # Color based on sentiment
+                    if bullish_pct >= 60:
+                        sentiment_color = "🟢"
+                    elif bullish_pct >= 40:
+                        sentiment_color = "🟡"
+                    else:
+                        sentiment_color = "🔴"
+                    
+                    st.metric(
+                        f"{sentiment_color} ${row.Index}",
+                        f"{row.mentions} mentions",
+                        f"{bullish_pct:.0f}% bullish"
+                    )
         else:
             st.info("No trending tickers detected in recent discussions")
     else:
@@ -665,26 +609,19 @@ def presentation_page():
             selected_asset = st.selectbox("Asset:", available_assets, index=0 if len(available_assets) > 0 else None, key="asset_selector")
             
             if selected_asset:
-                asset_prices = price_df[price_df['symbol'] == selected_asset].copy().sort_values('timestamp')
-                sentiment_data = df[df['category'] == 'CRYPTO'].copy() if 'category' in df.columns else df.copy()  # Use all historical data for trends
+                day_bars = price_bars(price_df, '1d')
+                asset_bars = day_bars[day_bars['symbol'] == selected_asset]
+                all_cells = sentiment_cube(df).cells()
+                sentiment_cells = all_cells[all_cells['category'] == 'CRYPTO'] if 'category' in df.columns else all_cells  # Use all historical data for trends
                 
-                if not sentiment_data.empty:
-                    sentiment_data['timestamp'] = pd.to_datetime(sentiment_data['timestamp'])
-                    sentiment_data['date'] = sentiment_data['timestamp'].dt.date
-                    asset_prices['date'] = asset_prices['timestamp'].dt.date
-                    
-                    # Calculate all sentiment categories
-                    sentiment_data['sentiment_category'] = sentiment_data['sentiment_label'].map({
-                        '1 star': 'Bearish', '2 stars': 'Bearish', '3 stars': 'Neutral',
-                        '4 stars': 'Bullish', '5 stars': 'Bullish'
-                    })
-                    
+                if post_count(sentiment_cells):
                     # Group by date and sentiment category
-                    daily_sentiment = sentiment_data.groupby(['date', 'sentiment_category']).size().unstack(fill_value=0)
+                    daily_sentiment = sentiment_counts(sentiment_cells, ['date'])
                     daily_sentiment_pct = daily_sentiment.div(daily_sentiment.sum(axis=1), axis=0) * 100
                     daily_sentiment_pct = daily_sentiment_pct.reset_index()
                     
-                    daily_prices = asset_prices.groupby('date')['price'].mean().reset_index()
+                    # Daily bars carry the mean of the day's price rows
+                    daily_prices = asset_bars[['date', 'mean']].rename(columns={'mean': 'price'})
                     
                     try:
                         from plotly.subplots import make_subplots
@@ -787,98 +724,215 @@ def presentation_page():
 
 
 
+# Bitcoin halvings marked on the macro charts
+PAST_HALVINGS = ['2012-11-28', '2016-07-09', '2020-05-11', '2024-04-20']
+FUTURE_HALVINGS = ['2028-04-20']  # Estimated next halving (~4 years after 2024)
+
+
+def add_halving_markers(fig):
+    """Vertical lines and labels for past (red) and estimated future (orange) halvings"""
+    # Past halvings (solid red lines)
+    for i, halving_date in enumerate(PAST_HALVINGS):
+        fig.add_shape(
+            type="line",
+            x0=halving_date, x1=halving_date,
+            y0=0, y1=1,
+            yref="paper",
+            line=dict(color="red", width=2, dash="dot"),
+            opacity=0.7
+        )
+        fig.add_annotation(
+            x=halving_date,
+            y=1.02,
+            yref="paper",
+            text=f"Halving {i+1}",
+            showarrow=False,
+            font=dict(color="red", size=10)
+        )
+    
+    # Future halvings (dashed orange lines)
+    for i, halving_date in enumerate(FUTURE_HALVINGS):
+        fig.add_shape(
+            type="line",
+            x0=halving_date, x1=halving_date,
+            y0=0, y1=1,
+            yref="paper",
+            line=dict(color="orange", width=2, dash="dash"),
+            opacity=0.5
+        )
+        fig.add_annotation(
+            x=halving_date,
+            y=1.02,
+            yref="paper",
+            text=f"Halving {len(PAST_HALVINGS)+i+1} (Est.)",
+            showarrow=False,
+            font=dict(color="orange", size=10)
+        )
+
+
+def build_supply_figure(btc_supply_data):
+    from plotly.subplots import make_subplots
+    import plotly.graph_objects as go
+    
+    fig_supply = make_subplots(specs=[[{"secondary_y": True}]])
+    
+    # Long series are cut to a point budget before plotting
+    supply_chart = downsample(btc_supply_data, 'value', x='date')
+    
+    # Supply progression line
+    fig_supply.add_trace(go.Scatter(
+        x=supply_chart['date'],
+        y=supply_chart['value'],
+        mode='lines',
+        name='BTC Supply',
+        line=dict(color='#FF9500', width=3)
+    ), secondary_y=False)
+    
+    # Supply percentage line
+    fig_supply.add_trace(go.Scatter(
+        x=supply_chart['date'],
+        y=supply_chart['supply_percentage'],
+        mode='lines',
+        name='% of Max Supply',
+        line=dict(color='white', width=2, dash='dash')
+    ), secondary_y=True)
+    
+    # Add halving events (vertical lines)
+    add_halving_markers(fig_supply)
+    
+    fig_supply.update_layout(title="Bitcoin Supply Scarcity (2009-Present)")
+    fig_supply.update_yaxes(title_text="BTC Supply (Millions)", secondary_y=False)
+    fig_supply.update_yaxes(title_text="% of Max Supply", secondary_y=True)
+    return fig_supply
+
+
+def build_market_cap_figure(m2_data, btc_market_cap_data):
+    from plotly.subplots import make_subplots
+    import plotly.graph_objects as go
+    
+    fig_ratio = make_subplots(specs=[[{"secondary_y": True}]])
+    m2_chart = downsample(m2_data, 'm2_trillions', x='date')
+    btc_cap_chart = downsample(btc_market_cap_data, 'btc_cap_trillions', x='date')
+    
+    # M2 Money Supply (left axis)
+    fig_ratio.add_trace(go.Scatter(
+        x=m2_chart['date'],
+        y=m2_chart['m2_trillions'],
+        mode='lines',
+        name='USD M2 Supply',
+        line=dict(color='#FF6B6B', width=4)
+    ), secondary_y=False)
+    
+    # Bitcoin Market Cap (right axis)
+    fig_ratio.add_trace(go.Scatter(
+        x=btc_cap_chart['date'],
+        y=btc_cap_chart['btc_cap_trillions'],
+        mode='lines',
+        name='Bitcoin Market Cap',
+        line=dict(color='#FF9500', width=4)
+    ), secondary_y=True)
+    
+    fig_ratio.update_layout(title="Bitcoin Market Cap vs USD M2 Money Supply")
+    fig_ratio.update_yaxes(title_text="USD M2 Supply (Trillions $)", secondary_y=False)
+    fig_ratio.update_yaxes(title_text="Bitcoin Market Cap (Trillions $)", secondary_y=True)
+    return fig_ratio
+
+
+def build_money_supply_figure(m2_data, btc_supply_data):
+    from plotly.subplots import make_subplots
+    import plotly.graph_objects as go
+    
+    fig_usd = make_subplots(specs=[[{"secondary_y": True}]])
+    
+    # M2 Money Supply (left axis)
+    if not m2_data.empty:
+        m2_chart = downsample(m2_data, 'value', x='date')
+        fig_usd.add_trace(go.Scatter(
+            x=m2_chart['date'],
+            y=m2_chart['value'],
+            mode='lines',
+            name='USD M2 Supply (Billions)',
+            line=dict(color='#FF6B6B', width=4)
+        ), secondary_y=False)
+    
+    # Bitcoin supply (right axis)
+    if not btc_supply_data.empty:
+        supply_chart = downsample(btc_supply_data, 'value', x='date')
+        fig_usd.add_trace(go.Scatter(
+            x=supply_chart['date'],
+            y=supply_chart['value'],
+            mode='lines',
+            name='Bitcoin Supply (Millions)',
+            line=dict(color='#FF9500', width=4)
+        ), secondary_y=True)
+    
+    fig_usd.update_layout(title="USD Money Printing vs Bitcoin Fixed Supply")
+    fig_usd.update_yaxes(title_text="USD M2 Supply (Billions $)", secondary_y=False)
+    fig_usd.update_yaxes(title_text="Bitcoin Supply (Millions BTC)", secondary_y=True)
+    return fig_usd
+
+
+def build_network_figure(hash_rate_data, difficulty_data):
+    from plotly.subplots import make_subplots
+    import plotly.graph_objects as go
+    
+    fig_network = make_subplots(specs=[[{"secondary_y": True}]])
+    
+    # Hash Rate (network security)
+    if not hash_rate_data.empty:
+        hash_rate_chart = downsample(hash_rate_data, 'hash_rate_eh', x='date')
+        fig_network.add_trace(go.Scatter(
+            x=hash_rate_chart['date'],
+            y=hash_rate_chart['hash_rate_eh'],
+            mode='lines',
+            name='Hash Rate (EH/s)',
+            line=dict(color='#00CC44', width=3)
+        ), secondary_y=False)
+    
+    # Mining Difficulty
+    if not difficulty_data.empty:
+        difficulty_chart = downsample(difficulty_data, 'difficulty_t', x='date')
+        fig_network.add_trace(go.Scatter(
+            x=difficulty_chart['date'],
+            y=difficulty_chart['difficulty_t'],
+            mode='lines',
+            name='Mining Difficulty (T)',
+            line=dict(color='#FF6B6B', width=3)
+        ), secondary_y=True)
+    
+    # Add halving events (vertical lines)
+    add_halving_markers(fig_network)
+    
+    fig_network.update_layout(title="Bitcoin Network Security Growth (2009-Present)")
+    fig_network.update_yaxes(title_text="Hash Rate (Exahashes/sec)", secondary_y=False)
+    fig_network.update_yaxes(title_text="Mining Difficulty (Trillions)", secondary_y=True)
+    return fig_network
+
+
 def macro_analysis_page():
     st.title("🌍 Macro Analysis")
     st.markdown("*Bitcoin fundamentals and macro-economic context*")
     st.markdown("---")
     
     loader = DataLoader()
-    historical_df = loader.load_historical_data()
+    metrics = loader.load_metric_store()
+    historical_df = metrics.source
     
     if historical_df.empty:
         st.warning("No historical data available. Run the historical backfill script.")
         return
     
     # Bitcoin Supply Scarcity Chart
-    btc_supply_data = historical_df[historical_df['metric'] == 'total-bitcoins'].copy()
+    btc_supply_data = metrics.frame('total-bitcoins')
     if not btc_supply_data.empty:
-        btc_supply_data['date'] = pd.to_datetime(btc_supply_data['date'])
-        btc_supply_data = btc_supply_data.sort_values('date')
         
         # Calculate supply percentage
         btc_supply_data['supply_percentage'] = (btc_supply_data['value'] / 21_000_000) * 100
         
-        from plotly.subplots import make_subplots
-        import plotly.graph_objects as go
-        
         st.subheader("🪙 Bitcoin Supply Scarcity (2009-Present)")
         
-        fig_supply = make_subplots(specs=[[{"secondary_y": True}]])
-        
-        # Supply progression line
-        fig_supply.add_trace(go.Scatter(
-            x=btc_supply_data['date'],
-            y=btc_supply_data['value'],
-            mode='lines',
-            name='BTC Supply',
-            line=dict(color='#FF9500', width=3)
-        ), secondary_y=False)
-        
-        # Supply percentage line
-        fig_supply.add_trace(go.Scatter(
-            x=btc_supply_data['date'],
-            y=btc_supply_data['supply_percentage'],
-            mode='lines',
-            name='% of Max Supply',
-            line=dict(color='white', width=2, dash='dash')
-        ), secondary_y=True)
-        
-        # Add halving events (vertical lines)
-        past_halvings = ['2012-11-28', '2016-07-09', '2020-05-11', '2024-04-20']
-        future_halvings = ['2028-04-20']  # Estimated next halving (~4 years after 2024)
-        
-        # Past halvings (solid red lines)
-        for i, halving_date in enumerate(past_halvings):
-            fig_supply.add_shape(
-                type="line",
-                x0=halving_date, x1=halving_date,
-                y0=0, y1=1,
-                yref="paper",
-                line=dict(color="red", width=2, dash="dot"),
-                opacity=0.7
-            )
-            fig_supply.add_annotation(
-                x=halving_date,
-                y=1.02,
-                yref="paper",
-                text=f"Halving {i+1}",
-                showarrow=False,
-                font=dict(color="red", size=10)
-            )
-        
-        # Future halvings (dashed orange lines)
-        for i, halving_date in enumerate(future_halvings):
-            fig_supply.add_shape(
-                type="line",
-                x0=halving_date, x1=halving_date,
-                y0=0, y1=1,
-                yref="paper",
-                line=dict(color="orange", width=2, dash="dash"),
-                opacity=0.5
-            )
-            fig_supply.add_annotation(
-                x=halving_date,
-                y=1.02,
-                yref="paper",
-                text=f"Halving {len(past_halvings)+i+1} (Est.)",
-                showarrow=False,
-                font=dict(color="orange", size=10)
-            )
-        
-        fig_supply.update_layout(title="Bitcoin Supply Scarcity (2009-Present)")
-        fig_supply.update_yaxes(title_text="BTC Supply (Millions)", secondary_y=False)
-        fig_supply.update_yaxes(title_text="% of Max Supply", secondary_y=True)
-        
+        # Figures are rebuilt only when the historical dataset version changes
+        fig_supply = cached_figure('macro_supply', historical_df, lambda: build_supply_figure(btc_supply_data))
         st.plotly_chart(fig_supply, use_container_width=True)
         
         # Current supply metrics
@@ -893,54 +947,28 @@ def macro_analysis_page():
             st.metric("Remaining", f"{remaining:,.0f} BTC")
     
     # Bitcoin Market Cap vs M2 Money Supply
-    m2_data = historical_df[historical_df['metric'] == 'M2SL'].copy()
-    btc_market_cap_data = historical_df[historical_df['metric'] == 'market-cap'].copy()
+    m2_data = metrics.frame('M2SL')
+    btc_market_cap_data = metrics.frame('market-cap')
     
     if not m2_data.empty and not btc_market_cap_data.empty:
         st.subheader("💰 Bitcoin Market Cap vs USD M2 Money Supply")
         
-        # Prepare data
-        m2_data['date'] = pd.to_datetime(m2_data['date'])
-        m2_data = m2_data.sort_values('date')
-        btc_market_cap_data['date'] = pd.to_datetime(btc_market_cap_data['date'])
-        btc_market_cap_data = btc_market_cap_data.sort_values('date')
-        
         # Convert M2 from billions to trillions for better scale
         m2_data['m2_trillions'] = m2_data['value'] / 1000
         # Convert BTC market cap from USD to trillions
         btc_market_cap_data['btc_cap_trillions'] = btc_market_cap_data['value'] / 1_000_000_000_000
         
-        fig_ratio = make_subplots(specs=[[{"secondary_y": True}]])
-        
-        # M2 Money Supply (left axis)
-        fig_ratio.add_trace(go.Scatter(
-            x=m2_data['date'],
-            y=m2_data['m2_trillions'],
-            mode='lines',
-            name='USD M2 Supply',
-            line=dict(color='#FF6B6B', width=4)
-        ), secondary_y=False)
-        
-        # Bitcoin Market Cap (right axis)
-        fig_ratio.add_trace(go.Scatter(
-            x=btc_market_cap_data['date'],
-            y=btc_market_cap_data['btc_cap_trillions'],
-            mode='lines',
-            name='Bitcoin Market Cap',
-            line=dict(color='#FF9500', width=4)
-        ), secondary_y=True)
-        
-        fig_ratio.update_layout(title="Bitcoin Market Cap vs USD M2 Money Supply")
-        fig_ratio.update_yaxes(title_text="USD M2 Supply (Trillions $)", secondary_y=False)
-        fig_ratio.update_yaxes(title_text="Bitcoin Market Cap (Trillions $)", secondary_y=True)
-        
+        fig_ratio = cached_figure('macro_market_cap', historical_df, lambda: build_market_cap_figure(m2_data, btc_market_cap_data))
         st.plotly_chart(fig_ratio, use_container_width=True)
         
         # Calculate ratio metrics
         if not m2_data.empty and not btc_market_cap_data.empty:
             latest_m2 = m2_data.iloc[-1]
             latest_btc_cap = btc_market_cap_data.iloc[-1]
-            btc_to_m2_ratio = (latest_btc_cap['value'] / (latest_m2['value'] * 1_000_000_000)) * 100  # Convert M2 to actual USD
+            # Market cap on each of its dates against the M2 value in effect then
+            cap_vs_m2 = metrics.aligned('market-cap', 'M2SL').dropna()
+            btc_to_m2 = (cap_vs_m2['market-cap'] / (cap_vs_m2['M2SL'] * 1_000_000_000)) * 100  # Convert M2 to actual USD
+            btc_to_m2_ratio = btc_to_m2.iloc[-1] if not btc_to_m2.empty else np.nan
             
             col1, col2, col3 = st.columns(3)
             with col1:
@@ -952,37 +980,12 @@ def macro_analysis_page():
                 st.caption("Bitcoin as % of USD money supply")
     
     # USD Money Supply vs Bitcoin Supply (Original Chart)
-    m1_data = historical_df[historical_df['metric'] == 'M1SL'].copy()
+    m1_data = metrics.frame('M1SL')
     
     if not m1_data.empty or not m2_data.empty:
         st.subheader("💵 USD Money Supply vs Bitcoin (Fixed Supply Contrast)")
         
-        fig_usd = make_subplots(specs=[[{"secondary_y": True}]])
-        
-        # M2 Money Supply (left axis)
-        if not m2_data.empty:
-            fig_usd.add_trace(go.Scatter(
-                x=m2_data['date'],
-                y=m2_data['value'],
-                mode='lines',
-                name='USD M2 Supply (Billions)',
-                line=dict(color='#FF6B6B', width=4)
-            ), secondary_y=False)
-        
-        # Bitcoin supply (right axis)
-        if not btc_supply_data.empty:
-            fig_usd.add_trace(go.Scatter(
-                x=btc_supply_data['date'],
-                y=btc_supply_data['value'],
-                mode='lines',
-                name='Bitcoin Supply (Millions)',
-                line=dict(color='#FF9500', width=4)
-            ), secondary_y=True)
-        
-        fig_usd.update_layout(title="USD Money Printing vs Bitcoin Fixed Supply")
-        fig_usd.update_yaxes(title_text="USD M2 Supply (Billions $)", secondary_y=False)
-        fig_usd.update_yaxes(title_text="Bitcoin Supply (Millions BTC)", secondary_y=True)
-        
+        fig_usd = cached_figure('macro_money_supply', historical_df, lambda: build_money_supply_figure(m2_data, btc_supply_data))
         st.plotly_chart(fig_usd, use_container_width=True)
         
         # Money supply metrics
@@ -1002,90 +1005,21 @@ def macro_analysis_page():
                     st.metric("BTC Supply", f"{btc_latest:,.0f}")
     
     # Bitcoin Network Health Chart
-    hash_rate_data = historical_df[historical_df['metric'] == 'hash-rate'].copy()
-    difficulty_data = historical_df[historical_df['metric'] == 'difficulty'].copy()
+    hash_rate_data = metrics.frame('hash-rate')
+    difficulty_data = metrics.frame('difficulty')
     
     if not hash_rate_data.empty or not difficulty_data.empty:
         st.subheader("🔒 Bitcoin Network Health (Security & Difficulty)")
         
-        fig_network = make_subplots(specs=[[{"secondary_y": True}]])
-        
-        # Hash Rate (network security)
+        # Hash Rate: convert to EH/s (blockchain.info returns TH/s, so divide by 1M to get EH/s)
         if not hash_rate_data.empty:
-            hash_rate_data['date'] = pd.to_datetime(hash_rate_data['date'])
-            hash_rate_data = hash_rate_data.sort_values('date')
-            # Convert to EH/s (blockchain.info returns TH/s, so divide by 1M to get EH/s)
             hash_rate_data['hash_rate_eh'] = hash_rate_data['value'] / 1_000_000
-            
-            fig_network.add_trace(go.Scatter(
-                x=hash_rate_data['date'],
-                y=hash_rate_data['hash_rate_eh'],
-                mode='lines',
-                name='Hash Rate (EH/s)',
-                line=dict(color='#00CC44', width=3)
-            ), secondary_y=False)
         
-        # Mining Difficulty
+        # Mining Difficulty: convert to trillions for readability
         if not difficulty_data.empty:
-            difficulty_data['date'] = pd.to_datetime(difficulty_data['date'])
-            difficulty_data = difficulty_data.sort_values('date')
-            # Convert to trillions for readability
             difficulty_data['difficulty_t'] = difficulty_data['value'] / 1_000_000_000_000
-            
-            fig_network.add_trace(go.Scatter(
-                x=difficulty_data['date'],
-                y=difficulty_data['difficulty_t'],
-                mode='lines',
-                name='Mining Difficulty (T)',
-                line=dict(color='#FF6B6B', width=3)
-            ), secondary_y=True)
-        
-        # Add halving events (vertical lines)
-        past_halvings = ['2012-11-28', '2016-07-09', '2020-05-11', '2024-04-20']
-        future_halvings = ['2028-04-20']
-        
-        # Past halvings (solid red lines)
-        for i, halving_date in enumerate(past_halvings):
-            fig_network.add_shape(
-                type="line",
-                x0=halving_date, x1=halving_date,
-                y0=0, y1=1,
-                yref="paper",
-                line=dict(color="red", width=2, dash="dot"),
-                opacity=0.7
-            )
-            fig_network.add_annotation(
-                x=halving_date,
-                y=1.02,
-                yref="paper",
-                text=f"Halving {i+1}",
-                showarrow=False,
-                font=dict(color="red", size=10)
-            )
-        
-        # Future halvings (dashed orange lines)
-        for i, halving_date in enumerate(future_halvings):
-            fig_network.add_shape(
-                type="line",
-                x0=halving_date, x1=halving_date,
-                y0=0, y1=1,
-                yref="paper",
-                line=dict(color="orange", width=2, dash="dash"),
-                opacity=0.5
-            )
-            fig_network.add_annotation(
-                x=halving_date,
-                y=1.02,
-                yref="paper",
-                text=f"Halving {len(past_halvings)+i+1} (Est.)",
-                showarrow=False,
-                font=dict(color="orange", size=10)
-            )
-        
-        fig_network.update_layout(title="Bitcoin Network Security Growth (2009-Present)")
-        fig_network.update_yaxes(title_text="Hash Rate (Exahashes/sec)", secondary_y=False)
-        fig_network.update_yaxes(title_text="Mining Difficulty (Trillions)", secondary_y=True)
         
+        fig_network = cached_figure('macro_network', historical_df, lambda: build_network_figure(hash_rate_data, difficulty_data))
         st.plotly_chart(fig_network, use_container_width=True)
         
         # Network health metrics
@@ -1119,69 +1053,25 @@ def indicators_page():
     # Asset selection
     available_assets = price_df['symbol'].unique()
     selected_asset = st.selectbox("Select Asset:", available_assets, index=0 if len(available_assets) > 0 else None)
+    interval = st.radio("Bar interval:", list(BAR_INTERVALS), index=1, horizontal=True)
     
     if selected_asset:
-        # Get price data for selected asset
-        asset_prices = price_df[price_df['symbol'] == selected_asset].copy().sort_values('timestamp')
-        asset_prices['timestamp'] = pd.to_datetime(asset_prices['timestamp'])
-        asset_prices = asset_prices.set_index('timestamp')
-        
-        # Calculate technical indicators
-        def calculate_sma(prices, window):
-            return prices.rolling(window=window).mean()
-        
-        def calculate_ema(prices, window):
-            return prices.ewm(span=window).mean()
-        
-        def calculate_rsi(prices, window=14):
-            delta = prices.diff()
-            gain = (delta.where(delta > 0, 0)).rolling(window=window).mean()
-            loss = (-delta.where(delta < 0, 0)).rolling(window=window).mean()
-            rs = gain / loss
-            return 100 - (100 / (1 + rs))
-        
-        def calculate_bollinger_bands(prices, window=20, num_std=2):
-            sma = prices.rolling(window=window).mean()
-            std = prices.rolling(window=window).std()
-            upper = sma + (std * num_std)
-            lower = sma - (std * num_std)
-            return upper, sma, lower
+        # Indicators run on regular OHLC bars (close price), extended with only new bars
+        bars = price_bars(price_df, interval)
+        asset_prices = indicators_by_symbol(bars, loader.bucket_name, interval).get(selected_asset, pd.DataFrame())
         
         # Check if we have enough data
         if len(asset_prices) < 21:
             st.warning(f"Need at least 21 data points for indicators. Currently have {len(asset_prices)} points.")
             return
         
-        # Calculate indicators with error handling
-        asset_prices['SMA_7'] = calculate_sma(asset_prices['price'], 7)
-        asset_prices['SMA_21'] = calculate_sma(asset_prices['price'], 21)
-        asset_prices['EMA_12'] = calculate_ema(asset_prices['price'], 12)
-        asset_prices['EMA_26'] = calculate_ema(asset_prices['price'], 26)
-        asset_prices['RSI'] = calculate_rsi(asset_prices['price'])
-        asset_prices['BB_Upper'], asset_prices['BB_Middle'], asset_prices['BB_Lower'] = calculate_bollinger_bands(asset_prices['price'])
-        
-        # MACD
-        asset_prices['MACD'] = asset_prices['EMA_12'] - asset_prices['EMA_26']
-        asset_prices['MACD_Signal'] = calculate_ema(asset_prices['MACD'], 9)
-        asset_prices['MACD_Histogram'] = asset_prices['MACD'] - asset_prices['MACD_Signal']
-        
         # Drop NaN values for visualization
         asset_prices_clean = asset_prices.dropna()
         
         # Sentiment momentum (if sentiment data available)
         if not df.empty and 'sentiment_label' in df.columns:
-            # Calculate daily sentiment
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
-            df['date'] = df['timestamp'].dt.date
-            
-            # Create sentiment categories
-            df['sentiment_category'] = df['sentiment_label'].map({
-                '1 star': 'Bearish', '2 stars': 'Bearish', '3 stars': 'Neutral',
-                '4 stars': 'Bullish', '5 stars': 'Bullish'
-            })
-            
-            # Daily sentiment aggregation
-            daily_sentiment = df.groupby(['date', 'sentiment_category']).size().unstack(fill_value=0)
+            # Daily sentiment aggregation from the cube
+            daily_sentiment = sentiment_counts(sentiment_cube(df).cells(), ['date'])
             daily_sentiment_pct = daily_sentiment.div(daily_sentiment.sum(axis=1), axis=0) * 100
             
             if 'Bullish' in daily_sentiment_pct.columns:
@@ -1197,29 +1087,32 @@ def indicators_page():
         
         fig_price = go.Figure()
         
+        # Each chart plots at most CHART_POINTS rows, picked by LTTB on its main series
+        price_chart = downsample(asset_prices_clean, 'price')
+        
         # Price line
         fig_price.add_trace(go.Scatter(
-            x=asset_prices_clean.index,
-            y=asset_prices_clean['price'],
+            x=price_chart.index,
+            y=price_chart['price'],
             mode='lines',
             name='Price',
             line=dict(color='white', width=3)
         ))
         
         # Moving averages (only show where data exists)
-        if 'SMA_7' in asset_prices_clean.columns and not asset_prices_clean['SMA_7'].isna().all():
+        if 'SMA_7' in price_chart.columns and not price_chart['SMA_7'].isna().all():
             fig_price.add_trace(go.Scatter(
-                x=asset_prices_clean.index,
-                y=asset_prices_clean['SMA_7'],
+                x=price_chart.index,
+                y=price_chart['SMA_7'],
                 mode='lines',
                 name='SMA 7',
                 line=dict(color='#00CC44', width=2)
             ))
         
-        if 'SMA_21' in asset_prices_clean.columns and not asset_prices_clean['SMA_21'].isna().all():
+        if 'SMA_21' in price_chart.columns and not price_chart['SMA_21'].isna().all():
             fig_price.add_trace(go.Scatter(
-                x=asset_prices_clean.index,
-                y=asset_prices_clean['SMA_21'],
+                x=price_chart.index,
+                y=price_chart['SMA_21'],
                 mode='lines',
                 name='SMA 21',
                 line=dict(color='#FF6B6B', width=2)
@@ -1232,11 +1125,12 @@ def indicators_page():
         st.subheader("RSI (Relative Strength Index)")
         
         fig_rsi = go.Figure()
+        rsi_chart = downsample(asset_prices_clean, 'RSI')
         
-        if 'RSI' in asset_prices_clean.columns and not asset_prices_clean['RSI'].isna().all():
+        if 'RSI' in rsi_chart.columns and not rsi_chart['RSI'].isna().all():
             fig_rsi.add_trace(go.Scatter(
-                x=asset_prices_clean.index,
-                y=asset_prices_clean['RSI'],
+                x=rsi_chart.index,
+                y=rsi_chart['RSI'],
                 mode='lines',
                 name='RSI',
                 line=dict(color='#FF9500', width=2)
@@ -1255,32 +1149,33 @@ def indicators_page():
         
         fig_macd = make_subplots(rows=2, cols=1, shared_xaxes=True, vertical_spacing=0.1,
                                 subplot_titles=["MACD Line & Signal", "MACD Histogram"])
+        macd_chart = downsample(asset_prices_clean, 'MACD')
         
         # MACD line and signal
-        if 'MACD' in asset_prices_clean.columns and not asset_prices_clean['MACD'].isna().all():
+        if 'MACD' in macd_chart.columns and not macd_chart['MACD'].isna().all():
             fig_macd.add_trace(go.Scatter(
-                x=asset_prices_clean.index,
-                y=asset_prices_clean['MACD'],
+                x=macd_chart.index,
+                y=macd_chart['MACD'],
                 mode='lines',
                 name='MACD',
                 line=dict(color='#00CC44', width=2)
             ), row=1, col=1)
         
-        if 'MACD_Signal' in asset_prices_clean.columns and not asset_prices_clean['MACD_Signal'].isna().all():
+        if 'MACD_Signal' in macd_chart.columns and not macd_chart['MACD_Signal'].isna().all():
             fig_macd.add_trace(go.Scatter(
-                x=asset_prices_clean.index,
-                y=asset_prices_clean['MACD_Signal'],
+                x=macd_chart.index,
+                y=macd_chart['MACD_Signal'],
                 mode='lines',
                 name='Signal',
                 line=dict(color='#FF6B6B', width=2)
             ), row=1, col=1)
         
         # MACD histogram
-        if 'MACD_Histogram' in asset_prices_clean.columns and not asset_prices_clean['MACD_Histogram'].isna().all():
-            colors = ['green' if x >= 0 else 'red' for x in asset_prices_clean['MACD_Histogram']]
+        if 'MACD_Histogram' in macd_chart.columns and not macd_chart['MACD_Histogram'].isna().all():
+            colors = ['green' if x >= 0 else 'red' for x in macd_chart['MACD_Histogram']]
             fig_macd.add_trace(go.Bar(
-                x=asset_prices_clean.index,
-                y=asset_prices_clean['MACD_Histogram'],
+                x=macd_chart.index,
+                y=macd_chart['MACD_Histogram'],
                 name='Histogram',
                 marker_color=colors
             ), row=2, col=1)
@@ -1395,7 +1290,7 @@ def debug_page():
         st.metric("Market Categories", categories)
     with col4:
         if 'sentiment_score' in df.columns:
-            avg_confidence = df['sentiment_score'].mean()
+            avg_confidence = mean_score(sentiment_cube(df).cells())
             st.metric("Avg Confidence", f"{avg_confidence:.3f}")
     with col5:
         unique_sources = df['url'].nunique() if 'url' in df.columns else 0
@@ -1409,7 +1304,6 @@ def debug_page():
     if not df.empty:
         st.write(f"**Sentiment Data:** {len(df)} records")
         if 'timestamp' in df.columns:
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
             st.write(f"Time range: {df['timestamp'].min()} to {df['timestamp'].max()}")
         
         if 'category' in df.columns:
@@ -1429,7 +1323,6 @@ def debug_page():
     if not price_df.empty:
         st.write(f"**Price Data:** {len(price_df)} records")
         if 'timestamp' in price_df.columns:
-            price_df['timestamp'] = pd.to_datetime(price_df['timestamp'])
             st.write(f"Time range: {price_df['timestamp'].min()} to {price_df['timestamp'].max()}")
         
         st.write("**Available Assets:**", list(price_df['symbol'].unique()))
@@ -1450,6 +1343,88 @@ def debug_page():
             st.dataframe(price_df.head(50), use_container_width=True)
         else:
             st.warning("No price data available")
+    
+    # S3 fetch engine timings (populated on cache misses)
+    st.subheader("S3 Fetch Stats")
+    
+    if FETCH_STATS:
+        fetch_summary = pd.DataFrame([
+            {
+                'Dataset': label,
+                'Objects': stats['objects'],
+                'Concurrency': stats['concurrency'],
+                'MB': stats['bytes'] / 1_000_000,
+                'Wall (s)': stats['wall_seconds'],
+                'Fetch (s)': stats['fetch_seconds'],
+                'Parse (s)': stats['parse_seconds'],
+                'Slowest Object': stats['slowest_key']
+            }
+            for label, stats in FETCH_STATS.items()
+        ])
+        st.dataframe(fetch_summary, use_container_width=True)
+        
+        with st.expander("Per-object timings"):
+            selected_label = st.selectbox("Dataset:", list(FETCH_STATS.keys()), key="fetch_stats_dataset")
+            st.dataframe(pd.DataFrame(FETCH_STATS[selected_label]['objects_detail']), use_container_width=True)
+    else:
+        st.info("No S3 fetches recorded in this process yet (data served from cache).")
+    
+    # Figure cache
+    st.subheader("🖼️ Figure Cache")
+    if FIGURE_CACHE_STATS:
+        figure_summary = pd.DataFrame([
+            {
+                'Figure': name,
+                'Hits': stats['hits'],
+                'Misses': stats['misses'],
+                'Hit Rate': stats['hits'] / (stats['hits'] + stats['misses'])
+            }
+            for name, stats in FIGURE_CACHE_STATS.items()
+        ])
+        st.dataframe(figure_summary, use_container_width=True)
+    else:
+        st.info("No cached figures requested in this process yet.")
+    
+    # Write-behind vote queue
+    st.subheader("🗳️ Vote Queue")
+    queues = vote_queues()
+    if queues:
+        queue_summary = pd.DataFrame([
+            {
+                'Bucket': bucket,
+                'Pending': queue.backlog(),
+                'Queued': queue.stats['queued'],
+                'Flushed': queue.stats['flushed'],
+                'Failed Flushes': queue.stats['failed_flushes'],
+                'Dead Letters': len(queue.dead_letters()),
+                'Last Flush': queue.stats['last_flush'],
+                'Last Maintenance': queue.stats['last_maintenance'],
+                'Last Error': queue.stats['last_error']
+            }
+            for bucket, queue in queues.items()
+        ])
+        st.dataframe(queue_summary, use_container_width=True)
+
+        # Votes whose writes failed MAX_ATTEMPTS times are kept on disk, not retried
+        for bucket, queue in queues.items():
+            dead_letters = queue.dead_letters()
+            if not dead_letters:
+                continue
+            st.warning(f"{len(dead_letters)} dead-lettered votes for {bucket}")
+            st.dataframe(pd.DataFrame([
+                {
+                    'Tally': vote['tally'],
+                    'Sentiment': vote['sentiment'],
+                    'Submitted': vote['timestamp'],
+                    'Attempts': vote.get('attempts'),
+                    'Error': vote.get('last_error')
+                }
+                for vote in dead_letters
+            ]), use_container_width=True)
+            if st.button("Retry dead-lettered votes", key=f"retry_dead_letters_{bucket}"):
+                st.success(f"Requeued {queue.retry_dead_letters()} votes")
+    else:
+        st.info("No votes queued in this process yet.")
 
 def trending_opportunities_page():
     add_auto_refresh()  # Enable auto-refresh for trending page
@@ -1474,8 +1449,8 @@ def trending_opportunities_page():
     
     # Trending data freshness
     if not trending_df.empty and 'detected_at' in trending_df.columns:
-        latest_detection = pd.to_datetime(trending_df['detected_at']).max()
-        hours_old = (pd.Timestamp.now() - latest_detection).total_seconds() / 3600
+        latest_detection = trending_df['detected_at'].max()
+        hours_old = (pd.Timestamp.now(tz='UTC') - latest_detection).total_seconds() / 3600
         
         if hours_old < 2:
             st.sidebar.markdown(f"🟢 **Trending data**: {hours_old:.1f}h old")
@@ -1490,9 +1465,8 @@ def trending_opportunities_page():
         return
     
     # Filter to recent opportunities (last 24 hours)
-    trending_df['detected_at'] = pd.to_datetime(trending_df['detected_at'])
-    recent_cutoff = pd.Timestamp.now() - pd.Timedelta(hours=24)
-    recent_trending = trending_df[trending_df['detected_at'] >= recent_cutoff].copy()
+    recent_cutoff = pd.Timestamp.now(tz='UTC') - pd.Timedelta(hours=24)
+    recent_trending = rows_since(trending_df, recent_cutoff, 'detected_at')
     
     if recent_trending.empty:
         st.info("No trending opportunities detected in the last 24 hours.")
@@ -1620,15 +1594,8 @@ def tesla_watch_page():
         st.warning("No data available. Run the data collection pipeline.")
         return
     
-    # Filter Tesla-related posts
-    tesla_keywords = ['tesla', 'tsla', 'elon', 'musk', 'cybertruck', 'model 3', 'model y', 'model s', 'autopilot', 'fsd']
-    tesla_pattern = '|'.join(tesla_keywords)
-    
-    # Search in title and content (handle NaN values)
-    tesla_posts = df[
-        df['title'].astype(str).str.contains(tesla_pattern, case=False, na=False) |
-        df['content'].astype(str).str.contains(tesla_pattern, case=False, na=False)
-    ].copy()
+    # Filter Tesla-related posts (keywords in title or content)
+    tesla_posts = TESLA_MATCHER.matching_rows(df)
     
     if tesla_posts.empty:
         st.warning("No Tesla-related posts found in recent data.")
@@ -1669,9 +1636,10 @@ def tesla_watch_page():
     if not price_df.empty:
         st.subheader("📈 Tesla vs S&P 500 Performance")
         
-        # Get Tesla and SPY data if available
-        tsla_data = price_df[price_df['symbol'] == 'TSLA'].copy()
-        spy_data = price_df[price_df['symbol'] == 'SPY'].copy()
+        # Get Tesla and SPY hourly bars if available
+        hour_bars = price_bars(price_df, '1h')
+        tsla_data = downsample(hour_bars[hour_bars['symbol'] == 'TSLA'], 'price', x='timestamp')
+        spy_data = downsample(hour_bars[hour_bars['symbol'] == 'SPY'], 'price', x='timestamp')
         
         if not tsla_data.empty and not spy_data.empty:
             # Simple comparison chart
@@ -1680,9 +1648,6 @@ def tesla_watch_page():
             
             fig = make_subplots(specs=[[{"secondary_y": True}]])
             
-            tsla_data['timestamp'] = pd.to_datetime(tsla_data['timestamp'])
-            spy_data['timestamp'] = pd.to_datetime(spy_data['timestamp'])
-            
             fig.add_trace(go.Scatter(
                 x=tsla_data['timestamp'],
                 y=tsla_data['price'],
@@ -1754,7 +1719,6 @@ def tesla_watch_page():
     
     # Sort by timestamp and show recent posts
     if 'timestamp' in tesla_posts.columns:
-        tesla_posts['timestamp'] = pd.to_datetime(tesla_posts['timestamp'])
         recent_tesla = tesla_posts.sort_values('timestamp', ascending=False).head(10)
     else:
         recent_tesla = tesla_posts.head(10)
@@ -1846,14 +1810,12 @@ def ipo_page():
     # IPO symbols to track
     ipo_symbols = ['BLSH', 'RIVN', 'LCID', 'HOOD', 'COIN', 'RBLX']
     
-    # Filter IPO-related posts
-    ipo_keywords = ['ipo', 'bullish', 'blsh'] + [s.lower() for s in ipo_symbols]
-    ipo_pattern = '|'.join(ipo_keywords)
+    # Post -> symbol membership, scanned once per processed-data version
+    ipo_index = mention_index(IPO_MATCHER, df)
+    symbol_index = mention_index(STOCK_MATCHER, df)
     
-    ipo_posts = df[
-        df['title'].astype(str).str.contains(ipo_pattern, case=False, na=False) |
-        df['content'].astype(str).str.contains(ipo_pattern, case=False, na=False)
-    ].copy()
+    # Filter IPO-related posts
+    ipo_posts = ipo_index.rows(df)
     
     # Load trending data for anomalies
     trending_df = loader.load_trending_data()
@@ -1863,9 +1825,8 @@ def ipo_page():
         st.subheader("🔥 Market Anomalies & Trending Stocks")
         
         # Filter to recent anomalies (last 24 hours)
-        trending_df['detected_at'] = pd.to_datetime(trending_df['detected_at'])
-        recent_cutoff = pd.Timestamp.now() - pd.Timedelta(hours=24)
-        recent_anomalies = trending_df[trending_df['detected_at'] >= recent_cutoff].copy()
+        recent_cutoff = pd.Timestamp.now(tz='UTC') - pd.Timedelta(hours=24)
+        recent_anomalies = rows_since(trending_df, recent_cutoff, 'detected_at')
         
         if not recent_anomalies.empty:
             # Get unique symbols with highest scores
@@ -1902,36 +1863,12 @@ def ipo_page():
     }
     all_stocks = list(stock_names.keys())
     
-    # Calculate post counts for sorting
-    stock_data = []
-    for symbol in all_stocks:
-        # For COIN, look for Coinbase-specific mentions
-        if symbol == 'COIN':
-            coinbase_pattern = r'coinbase|\$coin\b'
-            symbol_posts = df[
-                df['title'].astype(str).str.contains(coinbase_pattern, case=False, na=False, regex=True) |
-                df['content'].astype(str).str.contains(coinbase_pattern, case=False, na=False, regex=True)
-            ].copy()
-        # For HOOD, look for Robinhood-specific mentions
-        elif symbol == 'HOOD':
-            robinhood_pattern = r'robinhood|\$hood\b'
-            symbol_posts = df[
-                df['title'].astype(str).str.contains(robinhood_pattern, case=False, na=False, regex=True) |
-                df['content'].astype(str).str.contains(robinhood_pattern, case=False, na=False, regex=True)
-            ].copy()
-        else:
-            symbol_posts = df[
-                df['title'].astype(str).str.contains(symbol.lower(), case=False, na=False) |
-                df['content'].astype(str).str.contains(symbol.lower(), case=False, na=False)
-            ].copy()
-        
-        if not symbol_posts.empty and 'sentiment_label' in symbol_posts.columns:
-            symbol_posts = symbol_posts[symbol_posts['sentiment_label'].notna()]
-            post_count = len(symbol_posts)
-        else:
-            post_count = 0
-        
-        stock_data.append((symbol, post_count))
+    # Calculate post counts for sorting (posts with a sentiment label)
+    if 'sentiment_label' in df.columns:
+        post_counts = symbol_index.counts(df['sentiment_label'].notna().to_numpy())
+    else:
+        post_counts = pd.Series(0, index=all_stocks)
+    stock_data = [(symbol, int(post_counts[symbol])) for symbol in all_stocks]
     
     # Sort by post count (descending)
     stock_data.sort(key=lambda x: x[1], reverse=True)
@@ -1939,6 +1876,10 @@ def ipo_page():
     
     import plotly.graph_objects as go
     
+    # Community votes for the whole grid in one batched load
+    voting_system = VotingSystem()
+    stock_votes = voting_system.load_tallies("stocks", sorted_stocks)
+    
     # Stock grid - display all stocks ordered by post count (5 columns for compact display)
     for i in range(0, len(sorted_stocks), 5):
         cols = st.columns(5)
@@ -1947,24 +1888,8 @@ def ipo_page():
                 symbol = sorted_stocks[i + j]
                 
                 with cols[j]:
-                    # Filter posts for this symbol
-                    if symbol == 'COIN':
-                        coinbase_pattern = r'coinbase|\$coin\b'
-                        symbol_posts = df[
-                            df['title'].astype(str).str.contains(coinbase_pattern, case=False, na=False, regex=True) |
-                            df['content'].astype(str).str.contains(coinbase_pattern, case=False, na=False, regex=True)
-                        ].copy()
-                    elif symbol == 'HOOD':
-                        robinhood_pattern = r'robinhood|\$hood\b'
-                        symbol_posts = df[
-                            df['title'].astype(str).str.contains(robinhood_pattern, case=False, na=False, regex=True) |
-                            df['content'].astype(str).str.contains(robinhood_pattern, case=False, na=False, regex=True)
-                        ].copy()
-                    else:
-                        symbol_posts = df[
-                            df['title'].astype(str).str.contains(symbol.lower(), case=False, na=False) |
-                            df['content'].astype(str).str.contains(symbol.lower(), case=False, na=False)
-                        ].copy()
+                    # Posts for this symbol come straight from the index
+                    symbol_posts = symbol_index.rows(df, symbol)
                     
                     # Check if posts have sentiment data
                     has_sentiment = not symbol_posts.empty and 'sentiment_label' in symbol_posts.columns and not symbol_posts['sentiment_label'].isna().all()
@@ -2057,8 +1982,7 @@ def ipo_page():
                             st.caption(f"{post_count} posts")
                             
                             # Add voting widget
-                            voting_system = VotingSystem()
-                            voting_system.render_voting_widget("stocks", symbol)
+                            voting_system.render_voting_widget("stocks", symbol, votes_data=stock_votes[symbol])
                         else:
                             # Posts found but no valid sentiment
                             st.write(f"**{symbol}**")
@@ -2066,8 +1990,7 @@ def ipo_page():
                             st.caption("No Sentiment")
                             
                             # Add voting widget
-                            voting_system = VotingSystem()
-                            voting_system.render_voting_widget("stocks", symbol)
+                            voting_system.render_voting_widget("stocks", symbol, votes_data=stock_votes[symbol])
                     else:
                         # No data - show placeholder
                         st.write(f"**{symbol}**")
@@ -2075,15 +1998,77 @@ def ipo_page():
                         st.caption("No Data")
                         
                         # Add voting widget
-                        voting_system = VotingSystem()
-                        voting_system.render_voting_widget("stocks", symbol)
+                        voting_system.render_voting_widget("stocks", symbol, votes_data=stock_votes[symbol])
+        
+    # Community votes over time, from the hourly/daily vote rollups
+    st.subheader("🗳️ Community Votes Over Time")
+    vote_col1, vote_col2 = st.columns([1, 3])
+    with vote_col1:
+        vote_symbol = st.selectbox("Stock:", sorted_stocks, key="vote_history_symbol")
+        vote_interval = st.radio("Interval:", list(ROLLUP_INTERVALS), index=1, horizontal=True, key="vote_history_interval")
+    
+    vote_history = vote_rollup("stocks", vote_symbol, vote_interval)
+    daily_votes = vote_history if vote_interval == '1d' else vote_rollup("stocks", vote_symbol, '1d')
+    
+    if daily_votes.empty:
+        with vote_col2:
+            st.info(f"No community votes recorded for {vote_symbol} yet.")
+    else:
+        import plotly.graph_objects as go
         
+        # Bullish share of the last 7 days (today included), compared with the 7 days before
+        week_start = pd.Timestamp.now(tz='UTC').floor('D') - pd.Timedelta(days=6)
+        this_week = daily_votes[daily_votes['time'] >= week_start]
+        last_week = daily_votes[(daily_votes['time'] >= week_start - pd.Timedelta(days=7)) & (daily_votes['time'] < week_start)]
+        
+        def bullish_share(rows):
+            total = rows['bullish'].sum() + rows['bearish'].sum()
+            return rows['bullish'].sum() / total * 100 if total > 0 else None
+        
+        week_share = bullish_share(this_week)
+        last_week_share = bullish_share(last_week)
+        
+        with vote_col1:
+            gauge = create_sentiment_gauge(
+                value=week_share if week_share is not None else 50,
+                title=f"{vote_symbol} Votes (7d)",
+                size='mini',
+                show_delta=week_share is not None and last_week_share is not None,
+                delta_ref=last_week_share,
+                is_community_sentiment=True
+            )
+            st.plotly_chart(gauge, use_container_width=True)
+            if week_share is None:
+                st.caption("No votes in the last 7 days")
+        
+        with vote_col2:
+            fig = go.Figure()
+            fig.add_trace(go.Bar(
+                x=vote_history['time'],
+                y=vote_history['bullish'],
+                name="Bullish",
+                marker_color='#00CC44'
+            ))
+            fig.add_trace(go.Bar(
+                x=vote_history['time'],
+                y=vote_history['bearish'],
+                name="Bearish",
+                marker_color='#FF4444'
+            ))
+            fig.update_layout(
+                title=f"{vote_symbol} Community Votes per {'Hour' if vote_interval == '1h' else 'Day'}",
+                xaxis_title="Time (UTC)",
+                yaxis_title="Votes",
+                barmode='stack',
+                height=350
+            )
+            st.plotly_chart(fig, use_container_width=True)
+    
     # Recent IPO discussions
     st.subheader("📝 Recent IPO Discussions")
     
     if not ipo_posts.empty:
         if 'timestamp' in ipo_posts.columns:
-            ipo_posts['timestamp'] = pd.to_datetime(ipo_posts['timestamp'])
             recent_ipo = ipo_posts.sort_values('timestamp', ascending=False).head(5)
         else:
             recent_ipo = ipo_posts.head(5)
@@ -2174,25 +2159,8 @@ def ai_insights_page():
     # Word frequency analysis
     st.subheader("📝 Most Common Words")
     
-    # Combine all text content
-    all_text = ""
-    for _, row in df.iterrows():
-        title = str(row.get('title', ''))
-        content = str(row.get('content', ''))
-        all_text += f" {title} {content}"
-    
-    # Basic word processing
-    import re
-    words = re.findall(r'\b\w+\b', all_text.lower())
-    
-    # Filter out common stop words and nan values
-    stop_words = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'is', 'are', 'was', 'were', 'be', 'been', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could', 'should', 'may', 'might', 'must', 'can', 'this', 'that', 'these', 'those', 'i', 'you', 'he', 'she', 'it', 'we', 'they', 'me', 'him', 'her', 'us', 'them', 'my', 'your', 'his', 'her', 'its', 'our', 'their', 'nan', 'none', 'null'}
-    
-    filtered_words = [word for word in words if word not in stop_words and len(word) > 2 and word != 'nan']
-    
-    # Count word frequency
-    from collections import Counter
-    word_counts = Counter(filtered_words)
+    # Term counts are computed in chunks and cached per processed-data version
+    word_counts = term_counts(df)
     
     # Display top words
     col1, col2 = st.columns(2)
@@ -2225,11 +2193,41 @@ def ai_insights_page():
         else:
             st.info("No words to display")
     
+    # Trending terms over recent windows, answered from day x category buckets
+    term_index = get_term_index(loader.bucket_name).update(df)
+    if term_index.words.buckets:
+        st.subheader("🔥 Trending Terms")
+        
+        windows = {"24h": pd.Timedelta(hours=24), "3d": pd.Timedelta(days=3), "7d": pd.Timedelta(days=7)}
+        col1, col2 = st.columns(2)
+        with col1:
+            window = st.radio("Window:", list(windows), horizontal=True, key="trending_terms_window")
+        with col2:
+            category_options = ["All"] + term_index.categories()
+            term_category = st.selectbox("Category:", category_options, key="trending_terms_category")
+        
+        since = pd.Timestamp.now(tz='UTC') - windows[window]
+        categories = None if term_category == "All" else [term_category]
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            st.write("**Top Words:**")
+            for word, count in term_index.top_terms(10, since=since, categories=categories):
+                st.write(f"{word}: {count}")
+        with col2:
+            st.write("**Top Phrases:**")
+            for phrase, count in term_index.top_terms(10, since=since, categories=categories, bigrams=True):
+                st.write(f"{phrase}: {count}")
+    
     # Sentiment by category analysis
     if 'category' in df.columns and 'sentiment_label' in df.columns:
         st.subheader("📈 AI Sentiment Analysis by Category")
         
-        category_sentiment = df.groupby(['category', 'sentiment_label']).size().unstack(fill_value=0)
+        category_cells = sentiment_cube(df).cells()
+        category_cells = category_cells[category_cells['category'] != MISSING]
+        category_sentiment = sentiment_counts(category_cells, ['category'], column='sentiment_label')
+        category_sentiment = category_sentiment.drop(columns=UNLABELLED, errors='ignore')
+        category_sentiment = category_sentiment[category_sentiment.sum(axis=1) > 0]
         
         import plotly.express as px
         
@@ -2258,7 +2256,7 @@ def ai_insights_page():
         st.metric("Market Categories", categories)
     with col4:
         if 'sentiment_score' in df.columns:
-            avg_confidence = df['sentiment_score'].mean()
+            avg_confidence = mean_score(sentiment_cube(df).cells())
             st.metric("Avg AI Confidence", f"{avg_confidence:.3f}")
     with col5:
         unique_sources = df['url'].nunique() if 'url' in df.columns else 0
@@ -2274,7 +2272,6 @@ def ai_insights_page():
             with col1:
                 st.write(f"**Sentiment Data:** {len(df)} records")
                 if 'timestamp' in df.columns:
-                    df['timestamp'] = pd.to_datetime(df['timestamp'])
                     st.write(f"Time range: {df['timestamp'].min()} to {df['timestamp'].max()}")
                 
                 if 'category' in df.columns:
@@ -2295,7 +2292,6 @@ def ai_insights_page():
                 if not price_df.empty:
                     st.write(f"**Price Data:** {len(price_df)} records")
                     if 'timestamp' in price_df.columns:
-                        price_df['timestamp'] = pd.to_datetime(price_df['timestamp'])
                         st.write(f"Time range: {price_df['timestamp'].min()} to {price_df['timestamp'].max()}")
                     st.write("**Available Assets:**", list(price_df['symbol'].unique()))
     
@@ -2345,6 +2341,7 @@ def main():
     # Manual cache clear button
     if st.sidebar.button("🔄 Force Refresh Data"):
         st.cache_data.clear()
+        st.cache_resource.clear()
         st.rerun()
     
     # Page navigation
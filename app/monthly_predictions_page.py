@@ -6,6 +6,8 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 from utils.data_loader import DataLoader
+from utils.price_bars import price_bars
+from utils.downsample import downsample
 from datetime import datetime, timedelta
 
 def monthly_predictions_page():
@@ -112,6 +114,7 @@ def monthly_predictions_page():
             st.subheader("📈 Prediction vs Reality Tracking")
             st.markdown("*Real price data tracking against predictions*")
             
+            hour_bars = price_bars(price_df, '1h')
             fig = go.Figure()
             
             for pred in current_predictions:
@@ -119,16 +122,13 @@ def monthly_predictions_page():
                 prediction_date = datetime.fromisoformat(pred['prediction_date']).date()
                 target_date = datetime.strptime(pred['target_month'], '%Y-%m').date().replace(day=28)
                 
-                # Get real price data for this symbol
-                symbol_prices = price_df[price_df['symbol'] == symbol].copy()
+                # Get real price data for this symbol (hourly closes)
+                symbol_prices = hour_bars[hour_bars['symbol'] == symbol]
                 if not symbol_prices.empty:
-                    symbol_prices['timestamp'] = pd.to_datetime(symbol_prices['timestamp'])
-                    symbol_prices['date'] = symbol_prices['timestamp'].dt.date
-                    
-                    prediction_datetime = pd.to_datetime(pred['prediction_date'])
+                    prediction_datetime = pd.to_datetime(pred['prediction_date'], utc=True)
                     
                     # Historical prices (before/at prediction date) + extend to prediction point
-                    hist_prices = symbol_prices[symbol_prices['timestamp'] <= prediction_datetime]
+                    hist_prices = downsample(symbol_prices[symbol_prices['timestamp'] <= prediction_datetime], 'price', x='timestamp')
                     if not hist_prices.empty:
                         # Add prediction point to historical line to eliminate gap
                         hist_x = list(hist_prices['timestamp']) + [prediction_datetime]
@@ -143,8 +143,7 @@ def monthly_predictions_page():
                         ))
                     
                     # Current/tracking prices (only data collected AFTER prediction was made)
-                    prediction_datetime = pd.to_datetime(pred['prediction_date'])
-                    current_prices = symbol_prices[symbol_prices['timestamp'] > prediction_datetime]
+                    current_prices = downsample(symbol_prices[symbol_prices['timestamp'] > prediction_datetime], 'price', x='timestamp')
                     if not current_prices.empty:
                         fig.add_trace(go.Scatter(
                             x=current_prices['timestamp'],
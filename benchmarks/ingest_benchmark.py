@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+CSV ingestion benchmark
+Compares the legacy decode + StringIO + read_csv path with read_csv_bytes,
+reporting parse time and peak RSS per dataset
+
+Usage:
+    python benchmarks/ingest_benchmark.py                 # latest object per dataset from S3
+    python benchmarks/ingest_benchmark.py --synthetic 200000
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from dotenv import load_dotenv
+
+DATASET_PREFIXES = {
+    'processed': 'processed-data/',
+    'historical': 'raw-data/historical_data_',
+    'price': 'raw-data/price_data_',
+    'fear_greed': 'raw-data/fear_greed_index_',
+    'trending': 'raw-data/trending_opportunities_'
+}
+
+
+def _peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS reports bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _run(path, dataset, method, queue):
+    """Parse one file in a fresh process so peak RSS covers only this run"""
+    import pandas as pd
+    from io import StringIO
+    from utils.csv_reader import read_csv_bytes
+
+    with open(path, 'rb') as f:
+        body = f.read()
+    baseline = _peak_rss_mb()
+
+    start = time.perf_counter()
+    if method == 'legacy':
+        csv_content = body.decode('utf-8')
+        df = pd.read_csv(StringIO(csv_content), low_memory=False)
+    else:
+        df = read_csv_bytes(body, dataset)
+    elapsed = time.perf_counter() - start
+
+    queue.put({
+        'rows': len(df),
+        'seconds': elapsed,
+        'peak_rss_mb': _peak_rss_mb(),
+        'rss_growth_mb': _peak_rss_mb() - baseline,
+        'frame_mb': df.memory_usage(deep=True).sum() / 1_000_000
+    })
+
+
+def measure(path, dataset, method):
+    ctx = multiprocessing.get_context('spawn')
+    queue = ctx.Queue()
+    process = ctx.Process(target=_run, args=(path, dataset, method, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def synthetic_processed(rows):
+    """Processed-data shaped CSV with free-text columns"""
+    words = ['bitcoin', 'eth', 'moon', 'bearish', 'rally', 'fed', 'rates', 'tsla', 'buy', 'sell', 'hodl']
+    labels = ['1 star', '2 stars', '3 stars', '4 stars', '5 stars']
+    lines = ['timestamp,title,content,subreddit,category,sentiment_label,sentiment_score,url,platform']
+    for i in range(rows):
+        title = ' '.join(random.choices(words, k=8))
+        content = ' '.join(random.choices(words, k=60))
+        lines.append(
+            f'2024-01-{i % 28 + 1:02d}T{i % 24:02d}:00:00,"{title}","{content}",'
+            f'r{i % 40},{random.choice(["CRYPTO", "ECONOMICS", "US_STOCKS"])},'
+            f'{random.choice(labels)},{random.random():.4f},https://example.com/{i},reddit'
+        )
+    return ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+def download_latest(workdir):
+    """Download the latest object for each dataset"""
+    from utils.data_loader import DataLoader
+
+    loader = DataLoader()
+    paths = {}
+    for dataset, prefix in DATASET_PREFIXES.items():
+        latest = loader.manifest(prefix).latest()
+        if latest is None:
+            continue
+        response = loader.s3_client.get_object(Bucket=loader.bucket_name, Key=latest['Key'])
+        path = os.path.join(workdir, f"{dataset}.csv")
+        with open(path, 'wb') as f:
+            f.write(response['Body'].read())
+        paths[dataset] = path
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--synthetic', type=int, metavar='ROWS', help='benchmark a synthetic processed file instead of S3 data')
+    args = parser.parse_args()
+
+    load_dotenv()
+    with tempfile.TemporaryDirectory() as workdir:
+        if args.synthetic:
+            path = os.path.join(workdir, 'processed.csv')
+            with open(path, 'wb') as f:
+                f.write(synthetic_processed(args.synthetic))
+            paths = {'processed': path}
+        else:
+            paths = download_latest(workdir)
+
+        print(f"{'dataset':<12} {'method':<8} {'size MB':>8} {'rows':>9} {'parse s':>8} {'peak RSS MB':>12} {'RSS growth MB':>14} {'frame MB':>9}")
+        for dataset, path in paths.items():
+            size_mb = os.path.getsize(path) / 1_000_000
+            for method in ('legacy', 'arrow'):
+                r = measure(path, dataset, method)
+                print(f"{dataset:<12} {method:<8} {size_mb:>8.1f} {r['rows']:>9} {r['seconds']:>8.3f} "
+                      f"{r['peak_rss_mb']:>12.1f} {r['rss_growth_mb']:>14.1f} {r['frame_mb']:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Crypto coin attribution
+Assigns each CRYPTO post to one coin from configurable term lists, vectorized
+over the lowercased post text
+"""
+
+import pandas as pd
+import numpy as np
+import re
+from utils.ticker_mentions import post_text
+
+# Coin -> lowercase substrings of title/content/subreddit; coins are checked
+# in this order and the first match wins
+COIN_TERMS = {
+    'BTC': ['bitcoin', 'btc', 'r/bitcoin', 'r/btc', 'bitcoinmarkets'],
+    'ETH': ['ethereum', 'eth', 'r/ethereum', 'r/ethtrader', 'r/ethfinance'],
+    'XMR': ['monero', 'xmr', 'r/monero', 'r/xmrtrader'],
+    'LTC': ['litecoin', 'ltc', 'r/litecoin', 'r/litecoinmarkets']
+}
+OTHER_COIN = 'OTHER_CRYPTO'
+
+ATTRIBUTION_COLUMNS = ('title', 'content', 'subreddit')
+
+
+def coin_labels(df, coin_terms=COIN_TERMS):
+    """Categorical coin for every row of df, whatever its category"""
+    coins = list(coin_terms) + [OTHER_COIN]
+    if df.empty:
+        return pd.Categorical([], categories=coins)
+
+    text = post_text(df, ATTRIBUTION_COLUMNS).str.lower()
+    conditions = [
+        text.str.contains('|'.join(re.escape(term) for term in terms), regex=True).to_numpy()
+        for terms in coin_terms.values()
+    ]
+    return pd.Categorical(np.select(conditions, list(coin_terms), default=OTHER_COIN), categories=coins)
@@ -1,15 +1,131 @@
-import boto3
 import pandas as pd
 import streamlit as st
-from io import StringIO
+import functools
 import os
+from utils.csv_reader import read_csv_bytes
+from utils.s3_fetcher import S3Fetcher, get_s3_client
+from utils.s3_manifest import get_manifest
+from utils.price_store import get_price_store
+from utils.disk_cache import get_disk_cache, manifest_version
+from utils.schemas import apply_schema, add_time_buckets
+from utils.metric_store import MetricStore, metric_store
+
+# Copy-on-write lets callers share the cached frames' buffers safely (default from pandas 3)
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.set_option('mode.copy_on_write', True)
+
+
+def shared_frame(**cache_kwargs):
+    """Cache one frame per arguments and hand each caller a shallow copy of it
+
+    Unlike st.cache_data, nothing is pickled or deep-copied per call; with
+    copy-on-write, column assignments on the returned frame never reach the
+    cached one.
+    """
+    def decorator(func):
+        cached = st.cache_resource(**cache_kwargs)(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return cached(*args, **kwargs).copy(deep=False)
+        wrapper.clear = cached.clear
+        return wrapper
+    return decorator
+
+
+def _parse_processed(body):
+    """Parse a processed sentiment file"""
+    return read_csv_bytes(body, 'processed')
+
+
+def _parse_historical(body):
+    """Parse a historical metrics file"""
+    return read_csv_bytes(body, 'historical')
+
+
+def _parse_prices(body):
+    """Parse a regular price data file"""
+    return read_csv_bytes(body, 'price')
+
+
+def _parse_fear_greed(body):
+    """Parse a Fear & Greed Index file"""
+    return read_csv_bytes(body, 'fear_greed')
+
+
+def _parse_trending(body):
+    """Parse a trending opportunities file"""
+    return read_csv_bytes(body, 'trending')
+
+
+def _parse_quick_prices(body):
+    """Parse a quick price update and add missing columns for compatibility"""
+    df = _parse_prices(body)
+    if 'category' not in df.columns:
+        df['category'] = 'CRYPTO'
+    if 'volume_24h' not in df.columns:
+        df['volume_24h'] = 0
+    if 'volatility' not in df.columns:
+        df['volatility'] = abs(df.get('change_24h', 0))
+    if 'volume_price_ratio' not in df.columns:
+        df['volume_price_ratio'] = 0
+    if 'market_cap' not in df.columns:
+        df['market_cap'] = 0
+    return df
+
 
 class DataLoader:
-    def __init__(self):
-        self.s3_client = boto3.client('s3')
+    def __init__(self, max_workers=None):
+        self.s3_client = get_s3_client()
         self.bucket_name = os.getenv('S3_BUCKET_NAME')
+        self.fetcher = S3Fetcher(self.bucket_name, client=self.s3_client, max_workers=max_workers)
+        self.disk_cache = get_disk_cache(self.bucket_name)
     
-    @st.cache_data(ttl=600)  # 10 minutes TTL
+    def manifest(self, prefix, full=False):
+        """Complete, freshly refreshed object index for a prefix
+
+        With full, the prefix is re-listed so overwritten and deleted objects
+        show at once; the incremental refresh only sees new keys.
+        """
+        return get_manifest(self.bucket_name, prefix).refresh(full=full)
+    
+    def _load_object(self, key, parse, dataset):
+        """Load one object via the disk cache, validated with a HEAD request"""
+        head = self.s3_client.head_object(Bucket=self.bucket_name, Key=key)
+        etag = head['ETag'].strip('"')
+        
+        df = self.disk_cache.get(key, etag)
+        if df is None:
+            df = apply_schema(self.fetcher.fetch([key], parse, label=dataset)[0], dataset)
+            df = add_time_buckets(df, dataset)
+            self.disk_cache.put(key, etag, df)
+        # Cached frames already carry the schema, so these are no-ops for them
+        df = add_time_buckets(apply_schema(df, dataset), dataset)
+        # Lets derived indexes be reused until the object changes
+        df.attrs['source_version'] = f"{key}@{etag}"
+        return df
+    
+    def _load_prefix(self, prefix, parse, dataset):
+        """Load and concatenate every object under a prefix via the disk cache"""
+        # The combined frame's version comes from every ETag, so they must be current
+        entries = self.manifest(prefix, full=True).objects()
+        if not entries:
+            return pd.DataFrame()
+        
+        # The listing already carries every ETag, so no HEAD is needed
+        version = manifest_version(entries)
+        df = self.disk_cache.get(prefix, version)
+        if df is None:
+            frames = self.fetcher.fetch([e['Key'] for e in entries], parse, label=dataset)
+            # Categoricals are applied after concat so they share one category set
+            df = apply_schema(pd.concat(frames, ignore_index=True), dataset)
+            df = add_time_buckets(df, dataset)
+            self.disk_cache.put(prefix, version, df)
+        df = add_time_buckets(apply_schema(df, dataset), dataset)
+        df.attrs['source_version'] = f"{prefix}@{version}"
+        return df
+    
+    @shared_frame(ttl=600)  # 10 minutes TTL
     def load_processed_data(_self, filename: str = None) -> pd.DataFrame:
         """Load processed data from S3 with caching"""
         try:
@@ -17,114 +133,59 @@ class DataLoader:
                 key = f"processed-data/{filename}"
             else:
                 # Get the most recent processed file
-                objects = _self.s3_client.list_objects_v2(
-                    Bucket=_self.bucket_name,
-                    Prefix="processed-data/"
-                )
-                if not objects.get('Contents'):
+                latest = _self.manifest("processed-data/").latest()
+                if latest is None:
                     return pd.DataFrame()
-                
-                # Sort by last modified and get most recent
-                latest = sorted(objects['Contents'], 
-                              key=lambda x: x['LastModified'], 
-                              reverse=True)[0]
                 key = latest['Key']
             
-            response = _self.s3_client.get_object(
-                Bucket=_self.bucket_name,
-                Key=key
-            )
-            
-            csv_content = response['Body'].read().decode('utf-8')
-            df = pd.read_csv(StringIO(csv_content), low_memory=False)
-            return df
+            return _self._load_object(key, _parse_processed, dataset='processed')
             
         except Exception as e:
             st.error(f"Error loading data: {e}")
             return pd.DataFrame()
     
-    @st.cache_data(ttl=3600)  # 1 hour TTL
+    @shared_frame(ttl=3600)  # 1 hour TTL
     def load_historical_data(_self) -> pd.DataFrame:
         """Load historical data from S3 with caching"""
         try:
-            objects = _self.s3_client.list_objects_v2(
-                Bucket=_self.bucket_name,
-                Prefix="raw-data/historical_data_"
-            )
-            
-            if not objects.get('Contents'):
-                return pd.DataFrame()
-            
             # Get most recent historical file
-            latest = sorted(objects['Contents'], 
-                          key=lambda x: x['LastModified'], 
-                          reverse=True)[0]
-            
-            response = _self.s3_client.get_object(
-                Bucket=_self.bucket_name,
-                Key=latest['Key']
-            )
+            latest = _self.manifest("raw-data/historical_data_").latest()
+            if latest is None:
+                return pd.DataFrame()
             
-            csv_content = response['Body'].read().decode('utf-8')
-            df = pd.read_csv(StringIO(csv_content))
-            return df
+            return _self._load_object(latest['Key'], _parse_historical, dataset='historical')
             
         except Exception as e:
             st.error(f"Error loading historical data: {e}")
             return pd.DataFrame()
     
-    @st.cache_data(ttl=300)  # 5 minutes TTL for faster price updates
+    def load_metric_store(self) -> MetricStore:
+        """Historical data split per metric, rebuilt only when the data version changes"""
+        return metric_store(self.load_historical_data())
+    
+    @shared_frame(ttl=300)  # 5 minutes TTL for faster price updates
     def load_price_data(_self) -> pd.DataFrame:
         """Load price data from S3 with caching (includes quick updates)"""
         try:
-            all_price_data = []
-            
-            # Load regular price data
-            objects = _self.s3_client.list_objects_v2(
-                Bucket=_self.bucket_name,
-                Prefix="raw-data/price_data_"
-            )
-            
-            for obj in objects.get('Contents', []):
-                response = _self.s3_client.get_object(
-                    Bucket=_self.bucket_name,
-                    Key=obj['Key']
-                )
-                csv_content = response['Body'].read().decode('utf-8')
-                df = pd.read_csv(StringIO(csv_content))
-                all_price_data.append(df)
-            
-            # Load quick price updates
-            quick_objects = _self.s3_client.list_objects_v2(
-                Bucket=_self.bucket_name,
-                Prefix="raw-data/quick_prices_"
-            )
-            
-            for obj in quick_objects.get('Contents', []):
-                response = _self.s3_client.get_object(
-                    Bucket=_self.bucket_name,
-                    Key=obj['Key']
-                )
-                csv_content = response['Body'].read().decode('utf-8')
-                df = pd.read_csv(StringIO(csv_content))
-                # Add missing columns for compatibility
-                if 'category' not in df.columns:
-                    df['category'] = 'CRYPTO'
-                if 'volume_24h' not in df.columns:
-                    df['volume_24h'] = 0
-                if 'volatility' not in df.columns:
-                    df['volatility'] = abs(df.get('change_24h', 0))
-                if 'volume_price_ratio' not in df.columns:
-                    df['volume_price_ratio'] = 0
-                if 'market_cap' not in df.columns:
-                    df['market_cap'] = 0
-                all_price_data.append(df)
-            
-            if all_price_data:
-                combined_df = pd.concat(all_price_data, ignore_index=True, sort=False)
-                combined_df['timestamp'] = pd.to_datetime(combined_df['timestamp'])
+            # Only objects not yet in the local store are downloaded
+            store = get_price_store(_self.bucket_name)
+            # Full listings: the store drops and re-fetches by what exists now
+            price_objects = _self.manifest("raw-data/price_data_", full=True).objects()
+            quick_objects = _self.manifest("raw-data/quick_prices_", full=True).objects()
+            store.retain(price_objects + quick_objects)
+            new_prices = store.pending(price_objects)
+            new_quick = store.pending(quick_objects)
+            
+            price_frames = _self.fetcher.fetch([e['Key'] for e in new_prices], _parse_prices, label='price_data')
+            quick_frames = _self.fetcher.fetch([e['Key'] for e in new_quick], _parse_quick_prices, label='quick_prices')
+            store.append(new_prices + new_quick, price_frames + quick_frames)
+            
+            combined_df = store.read()
+            if not combined_df.empty:
                 # Keep all historical data, don't remove duplicates by symbol
-                return combined_df.sort_values('timestamp')
+                combined_df = add_time_buckets(apply_schema(combined_df, 'price'), 'price')
+                combined_df.attrs['source_version'] = f"prices@{manifest_version(price_objects + quick_objects)}"
+                return combined_df
             
             return pd.DataFrame()
             
@@ -132,32 +193,14 @@ class DataLoader:
             st.error(f"Error loading price data: {e}")
             return pd.DataFrame()
     
-    @st.cache_data(ttl=1800)  # 30 minutes TTL
+    @shared_frame(ttl=1800)  # 30 minutes TTL
     def load_fear_greed_data(_self) -> pd.DataFrame:
         """Load Fear & Greed Index data from S3 with caching"""
         try:
-            objects = _self.s3_client.list_objects_v2(
-                Bucket=_self.bucket_name,
-                Prefix="raw-data/fear_greed_index_"
-            )
+            combined_df = _self._load_prefix("raw-data/fear_greed_index_", _parse_fear_greed, dataset='fear_greed')
             
-            if not objects.get('Contents'):
-                return pd.DataFrame()
-            
-            all_fg_data = []
-            for obj in objects['Contents']:
-                response = _self.s3_client.get_object(
-                    Bucket=_self.bucket_name,
-                    Key=obj['Key']
-                )
-                csv_content = response['Body'].read().decode('utf-8')
-                df = pd.read_csv(StringIO(csv_content))
-                all_fg_data.append(df)
-            
-            if all_fg_data:
-                combined_df = pd.concat(all_fg_data, ignore_index=True)
-                combined_df['timestamp'] = pd.to_datetime(combined_df['timestamp'])
-                return combined_df.sort_values('timestamp')
+            if not combined_df.empty:
+                return combined_df
             
             return pd.DataFrame()
             
@@ -165,31 +208,13 @@ class DataLoader:
             st.error(f"Error loading Fear & Greed data: {e}")
             return pd.DataFrame()
     
-    @st.cache_data(ttl=1800)  # 30 minutes TTL
+    @shared_frame(ttl=1800)  # 30 minutes TTL
     def load_trending_data(_self) -> pd.DataFrame:
         """Load trending opportunities data from S3 with caching"""
         try:
-            objects = _self.s3_client.list_objects_v2(
-                Bucket=_self.bucket_name,
-                Prefix="raw-data/trending_opportunities_"
-            )
-            
-            if not objects.get('Contents'):
-                return pd.DataFrame()
+            combined_df = _self._load_prefix("raw-data/trending_opportunities_", _parse_trending, dataset='trending')
             
-            all_trending_data = []
-            for obj in objects['Contents']:
-                response = _self.s3_client.get_object(
-                    Bucket=_self.bucket_name,
-                    Key=obj['Key']
-                )
-                csv_content = response['Body'].read().decode('utf-8')
-                df = pd.read_csv(StringIO(csv_content))
-                all_trending_data.append(df)
-            
-            if all_trending_data:
-                combined_df = pd.concat(all_trending_data, ignore_index=True)
-                combined_df['detected_at'] = pd.to_datetime(combined_df['detected_at'])
+            if not combined_df.empty:
                 return combined_df
             
             return pd.DataFrame()
@@ -204,8 +229,8 @@ class DataLoader:
     def show_data_freshness(df):
         """Show data age indicator in sidebar for any page"""
         if not df.empty and 'timestamp' in df.columns:
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
-            latest_data_time = df['timestamp'].max()
+            # Loaders parse timestamps already; only the max is converted here
+            latest_data_time = pd.Timestamp(df['timestamp'].max())
             if latest_data_time.tz is None:
                 latest_data_time = latest_data_time.tz_localize('UTC')
             now_utc = pd.Timestamp.now(tz='UTC')
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+On-disk frame cache
+Stores parsed DataFrames as uncompressed Arrow IPC files keyed by S3 key + ETag
+"""
+
+import pyarrow as pa
+import pyarrow.feather as feather
+import hashlib
+import os
+import threading
+from utils.s3_manifest import CACHE_DIR
+
+_registry_lock = threading.Lock()
+_caches = {}
+
+
+def get_disk_cache(bucket_name):
+    """Return the shared disk cache for a bucket"""
+    with _registry_lock:
+        if bucket_name not in _caches:
+            _caches[bucket_name] = DiskCache(os.path.join(CACHE_DIR, 'frames', bucket_name))
+        return _caches[bucket_name]
+
+
+def manifest_version(entries):
+    """Single version tag for a set of manifest entries"""
+    digest = hashlib.sha1()
+    for entry in entries:
+        digest.update(f"{entry['Key']}:{entry['ETag']};".encode('utf-8'))
+    return digest.hexdigest()
+
+
+class DiskCache:
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def _prefix(self, key):
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+    def _path(self, key, etag):
+        return os.path.join(self.root, f"{self._prefix(key)}-{etag}.arrow")
+
+    def get(self, key, etag):
+        """Cached frame for this exact object version, or None"""
+        path = self._path(key, etag)
+        if not os.path.exists(path):
+            return None
+        try:
+            # Uncompressed IPC files are memory-mapped rather than read
+            return feather.read_table(path, memory_map=True).to_pandas()
+        except (OSError, pa.ArrowInvalid):
+            os.remove(path)
+            return None
+
+    def put(self, key, etag, df):
+        """Store a frame, replacing any older version of the same key"""
+        path = self._path(key, etag)
+        tmp_path = f"{path}.tmp"
+        try:
+            feather.write_feather(df.reset_index(drop=True), tmp_path, compression='uncompressed')
+        except (pa.ArrowException, ValueError, TypeError):
+            # Frames Arrow can't represent (e.g. mixed-type object columns) stay uncached
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+        os.replace(tmp_path, path)
+
+        prefix = f"{self._prefix(key)}-"
+        for name in os.listdir(self.root):
+            if name.startswith(prefix) and name.endswith('.arrow') and os.path.join(self.root, name) != path:
+                os.remove(os.path.join(self.root, name))
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Chart downsampling
+Largest-Triangle-Three-Buckets (LTTB) selection of the rows that keep a line's
+visual shape, so long series are cut to a fixed point budget before plotting
+"""
+
+import pandas as pd
+import numpy as np
+
+# Points per trace; about one per horizontal pixel of a full-width chart
+CHART_POINTS = 1000
+
+
+def lttb_indices(x, y, max_points=CHART_POINTS):
+    """Positions of at most max_points points of (x, y), first and last always included"""
+    n = len(x)
+    if max_points >= n or max_points < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype='float64')
+    y = np.asarray(y, dtype='float64')
+    # Bucket i of the inner points spans [edges[i], edges[i + 1])
+    every = (n - 2) / (max_points - 2)
+    edges = np.floor(np.arange(max_points - 1) * every).astype(np.int64) + 1
+    edges[-1] = n - 1
+
+    selected = np.empty(max_points, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(max_points - 2):
+        start, end = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_x = x[end:edges[i + 2]].mean()
+            next_y = y[end:edges[i + 2]].mean()
+        else:
+            next_x, next_y = x[-1], y[-1]
+
+        # Keep the point forming the largest triangle with the last kept point
+        # and the next bucket's average
+        area = np.abs(
+            (x[a] - next_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (next_y - y[a])
+        )
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def downsample(df, y, x=None, max_points=CHART_POINTS):
+    """Rows of df kept by LTTB on column y against column x (or the index)
+
+    Rows with a missing x or y are dropped once the frame is over budget.
+    """
+    if len(df) <= max_points:
+        return df
+    x_values = df.index if x is None else df[x]
+    missing_x = np.asarray(pd.isna(x_values))
+    if pd.api.types.is_datetime64_any_dtype(x_values):
+        x_values = x_values.to_numpy(dtype='datetime64[ns]').astype(np.int64)
+        if not missing_x.all():
+            x_values = x_values - x_values[~missing_x].min()  # Small offsets keep float precision
+    x_values = np.asarray(x_values, dtype='float64')
+    y_values = df[y].to_numpy(dtype='float64')
+
+    valid = np.isfinite(y_values) & ~missing_x
+    if not valid.all():
+        df, x_values, y_values = df[valid], x_values[valid], y_values[valid]
+    return df.iloc[lttb_indices(x_values, y_values, max_points)]
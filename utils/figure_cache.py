@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Figure cache
+Keeps built Plotly figures until their source dataset version or chart
+parameters change, so reruns skip figure construction
+"""
+
+import threading
+from utils.version_cache import frame_key
+
+# Hits/misses per figure name, shown on the debug page
+FIGURE_CACHE_STATS = {}
+
+_lock = threading.Lock()
+_figures = {}  # name -> ((frame key, params), figure)
+
+
+def cached_figure(name, df, build, *params):
+    """build(), reused while df's attrs['source_version'] and params are unchanged"""
+    version = df.attrs.get('source_version')
+    key = (frame_key(df), params)
+    with _lock:
+        stats = FIGURE_CACHE_STATS.setdefault(name, {'hits': 0, 'misses': 0})
+        cached = _figures.get(name)
+        if version is not None and cached is not None and cached[0] == key:
+            stats['hits'] += 1
+            return cached[1]
+        stats['misses'] += 1
+
+    figure = build()
+    if version is not None:
+        with _lock:
+            # Only the latest figure per name is kept
+            _figures[name] = (key, figure)
+    return figure
@@ -0,0 +1,405 @@
+#!/usr/bin/env python3
+"""
+Streaming indicator engine
+Per-symbol rolling state (window buffers, EMA and Wilder accumulators) that
+extends the indicator series in O(1) per new bar; the state is persisted
+beside the price store and each symbol's history is an append-only file
+"""
+
+import pandas as pd
+import numpy as np
+import copy
+import json
+import math
+import os
+import threading
+from collections import deque
+from urllib.parse import quote
+from utils.indicators import (
+    compute_indicators, INDICATOR_COLUMNS, SMA_WINDOWS, EMA_SPANS,
+    RSI_WINDOW, BB_WINDOW, BB_STD, MACD_SIGNAL_SPAN
+)
+from utils.s3_manifest import CACHE_DIR
+from utils.version_cache import per_version
+
+STATE_VERSION = 2
+
+_registry_lock = threading.Lock()
+_engines = {}
+
+
+def get_indicator_engine(bucket_name, interval):
+    """Return the shared indicator engine for a bucket's bars of one interval"""
+    with _registry_lock:
+        if (bucket_name, interval) not in _engines:
+            root = os.path.join(CACHE_DIR, 'indicators', bucket_name, interval)
+            _engines[(bucket_name, interval)] = IndicatorEngine(root)
+        return _engines[(bucket_name, interval)]
+
+
+class RollingWindow:
+    """Mean and sample variance of the last `size` values, updated Welford-style"""
+
+    def __init__(self, size, values=()):
+        self.size = size
+        self.values = deque(maxlen=size)
+        self.count = 0  # Non-NaN values in the window
+        self.mean = 0.0
+        self.m2 = 0.0
+        for value in values:
+            self.push(value)
+
+    def push(self, value):
+        if len(self.values) == self.size:
+            self._remove(self.values[0])
+        self.values.append(value)
+        if not math.isnan(value):
+            self.count += 1
+            delta = value - self.mean
+            self.mean += delta / self.count
+            self.m2 += delta * (value - self.mean)
+
+    def _remove(self, value):
+        if math.isnan(value):
+            return
+        if self.count == 1:
+            self.count, self.mean, self.m2 = 0, 0.0, 0.0
+            return
+        self.count -= 1
+        delta = value - self.mean
+        self.mean -= delta / self.count
+        self.m2 -= delta * (value - self.mean)
+
+    def copy(self):
+        clone = copy.copy(self)
+        clone.values = self.values.copy()
+        return clone
+
+    def full(self):
+        # Like rolling(size) in pandas: any NaN in the window gives NaN
+        return self.count == self.size
+
+    def average(self):
+        return self.mean if self.full() else np.nan
+
+    def std(self):
+        return math.sqrt(max(self.m2, 0.0) / (self.size - 1)) if self.full() else np.nan
+
+
+class EWMean:
+    """ewm(span=...).mean() with adjust=True, one value at a time"""
+
+    def __init__(self, span, num=0.0, den=0.0):
+        self.decay = 1 - 2 / (span + 1)
+        self.num = num
+        self.den = den
+
+    @classmethod
+    def over(cls, span, values):
+        """Accumulator state after a whole series"""
+        ewm = cls(span)
+        weights = ewm.decay ** np.arange(len(values) - 1, -1, -1, dtype='float64')
+        valid = ~np.isnan(values)
+        ewm.num = float(np.dot(weights[valid], values[valid]))
+        ewm.den = float(weights[valid].sum())
+        return ewm
+
+    def push(self, value):
+        # Missing values still age the earlier weights (ignore_na=False)
+        self.num *= self.decay
+        self.den *= self.decay
+        if not math.isnan(value):
+            self.num += value
+            self.den += 1.0
+        return self.num / self.den if self.den else np.nan
+
+
+class WilderMean:
+    """Wilder's smoothing: the mean of the first `window` values, then avg += (value - avg) / window"""
+
+    def __init__(self, window, count=0, mean=0.0):
+        self.window = window
+        self.count = count
+        self.mean = mean
+
+    @classmethod
+    def over(cls, window, values):
+        """Accumulator state after a whole series"""
+        wilder = cls(window, len(values))
+        if len(values) <= window:
+            wilder.mean = float(values.mean()) if len(values) else 0.0
+            return wilder
+        decay = 1 - 1 / window
+        rest = values[window:]
+        weights = decay ** np.arange(len(rest) - 1, -1, -1, dtype='float64')
+        wilder.mean = float(values[:window].mean() * decay ** len(rest) + np.dot(weights, rest) / window)
+        return wilder
+
+    def push(self, value):
+        self.count += 1
+        self.mean += (value - self.mean) / min(self.count, self.window)
+
+    def average(self):
+        return self.mean if self.count >= self.window else np.nan
+
+
+def _row_hashes(times, prices):
+    """Hash of each row's position, time and price, so edits and reordering both show"""
+    rows = pd.DataFrame({'time': times, 'price': prices})
+    return pd.util.hash_pandas_object(rows, index=True).to_numpy(dtype=np.uint64)
+
+
+def _digest(hashes):
+    """Wrapping sum of row hashes"""
+    return int(hashes.sum(dtype=np.uint64))
+
+
+def _rsi(gain, loss):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return 100 - (100 / (1 + np.float64(gain) / np.float64(loss)))
+
+
+class SymbolIndicators:
+    """Indicator state and output history for one symbol's timestamp-ordered prices"""
+
+    def __init__(self):
+        self.rows = 0
+        self.digest = 0  # _digest of the processed rows
+        self.last_price = np.nan
+        self.sma = {window: RollingWindow(window) for window in SMA_WINDOWS}
+        self.bb = RollingWindow(BB_WINDOW)
+        self.gain = WilderMean(RSI_WINDOW)
+        self.loss = WilderMean(RSI_WINDOW)
+        self.ema = {span: EWMean(span) for span in EMA_SPANS}
+        self.signal = EWMean(MACD_SIGNAL_SPAN)
+        self._chunks = []  # Output rows, in INDICATOR_COLUMNS order
+        self.tail = None   # Output for the last, still open row
+
+    @classmethod
+    def bootstrap(cls, prices, hashes):
+        """State and history for a full series, computed in one batch"""
+        state = cls()
+        if not len(prices):
+            return state
+        batch = compute_indicators(pd.DataFrame({'symbol': 'x', 'price': prices}))
+        history = batch[INDICATOR_COLUMNS].to_numpy(dtype='float64')
+
+        state.sma = {window: RollingWindow(window, prices[-window:]) for window in SMA_WINDOWS}
+        state.bb = RollingWindow(BB_WINDOW, prices[-BB_WINDOW:])
+        deltas = np.diff(prices)
+        with np.errstate(invalid='ignore'):
+            state.gain = WilderMean.over(RSI_WINDOW, np.where(deltas > 0, deltas, 0.0))
+            state.loss = WilderMean.over(RSI_WINDOW, -np.where(deltas < 0, deltas, 0.0))
+        state.ema = {span: EWMean.over(span, prices) for span in EMA_SPANS}
+        state.signal = EWMean.over(MACD_SIGNAL_SPAN, history[:, INDICATOR_COLUMNS.index('MACD')])
+
+        state.rows = len(prices)
+        state.digest = _digest(hashes)
+        state.last_price = float(prices[-1])
+        state._chunks = [history]
+        return state
+
+    def continues(self, hashes):
+        """Whether a series with these row hashes extends the rows already processed unchanged"""
+        if self.rows == 0 or len(hashes) < self.rows:
+            return False
+        return _digest(hashes[:self.rows]) == self.digest
+
+    def push(self, price):
+        """Indicator values for the next price row"""
+        if self.rows:
+            # The first row has no change; a missing price counts as no gain or loss
+            delta = price - self.last_price
+            self.gain.push(delta if delta > 0 else 0.0)
+            self.loss.push(-delta if delta < 0 else 0.0)
+        for rolling in self.sma.values():
+            rolling.push(price)
+        self.bb.push(price)
+
+        ema_fast, ema_slow = (self.ema[span].push(price) for span in EMA_SPANS)
+        macd = ema_fast - ema_slow
+        signal = self.signal.push(macd)
+        middle = self.bb.average()
+        std = self.bb.std()
+
+        self.rows += 1
+        self.last_price = float(price)
+        return [
+            *(rolling.average() for rolling in self.sma.values()),
+            ema_fast, ema_slow,
+            _rsi(self.gain.average(), self.loss.average()),
+            middle + std * BB_STD, middle, middle - std * BB_STD,
+            macd, signal, macd - signal
+        ]
+
+    def peek(self, price):
+        """Indicator values for a next row that may still change, leaving the state as is"""
+        clone = copy.copy(self)
+        clone.sma = {window: rolling.copy() for window, rolling in self.sma.items()}
+        clone.bb = self.bb.copy()
+        clone.gain, clone.loss = copy.copy(self.gain), copy.copy(self.loss)
+        clone.ema = {span: copy.copy(ewm) for span, ewm in self.ema.items()}
+        clone.signal = copy.copy(self.signal)
+        return clone.push(price)
+
+    def extend(self, prices, hashes):
+        """Push the rows after those already processed"""
+        new_rows = [self.push(price) for price in prices[self.rows:]]
+        if new_rows:
+            self._chunks.append(np.array(new_rows, dtype='float64'))
+        self.digest = _digest(hashes)
+
+    def history(self):
+        """Indicator values for every processed row"""
+        if len(self._chunks) != 1:
+            chunks = self._chunks or [np.empty((0, len(INDICATOR_COLUMNS)))]
+            self._chunks = [np.concatenate(chunks)]
+        return self._chunks[0]
+
+    def to_json(self):
+        return {
+            'rows': self.rows,
+            'digest': self.digest,
+            'last_price': self.last_price,
+            'sma': {str(window): list(rolling.values) for window, rolling in self.sma.items()},
+            'bb': list(self.bb.values),
+            'gain': [self.gain.count, self.gain.mean],
+            'loss': [self.loss.count, self.loss.mean],
+            'ema': {str(span): [ewm.num, ewm.den] for span, ewm in self.ema.items()},
+            'signal': [self.signal.num, self.signal.den]
+        }
+
+    @classmethod
+    def from_json(cls, data, history):
+        state = cls()
+        state.rows = data['rows']
+        state.digest = data['digest']
+        state.last_price = data['last_price']
+        state.sma = {int(window): RollingWindow(int(window), values) for window, values in data['sma'].items()}
+        state.bb = RollingWindow(BB_WINDOW, data['bb'])
+        state.gain = WilderMean(RSI_WINDOW, *data['gain'])
+        state.loss = WilderMean(RSI_WINDOW, *data['loss'])
+        state.ema = {int(span): EWMean(int(span), *values) for span, values in data['ema'].items()}
+        state.signal = EWMean(MACD_SIGNAL_SPAN, *data['signal'])
+        state._chunks = [history]
+        return state
+
+
+class IndicatorEngine:
+    """Indicator state for every symbol, extended with only the bars not yet seen
+
+    The last bar of each symbol is still open, so it is computed from a copy
+    of the state on every update and only committed once a later bar exists.
+    Histories are raw float64 rows in INDICATOR_COLUMNS order; new bars are
+    appended, and a file is only rewritten when its symbol is rebuilt.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.state_path = os.path.join(root, 'state.json')
+        self.lock = threading.Lock()
+        self.symbols = {}  # symbol -> SymbolIndicators
+        self._load()
+
+    def _history_path(self, symbol):
+        return os.path.join(self.root, f"{quote(str(symbol), safe='')}.f64")
+
+    def _load(self):
+        """Load saved state, skipping symbols whose history file is missing or short"""
+        os.makedirs(self.root, exist_ok=True)
+        try:
+            with open(self.state_path) as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            saved = {}
+        if saved.get('version') != STATE_VERSION or saved.get('columns') != INDICATOR_COLUMNS:
+            return  # Older layout: every symbol is rebuilt on the next update
+
+        width = len(INDICATOR_COLUMNS)
+        for symbol, data in saved['symbols'].items():
+            path = self._history_path(symbol)
+            try:
+                history = np.fromfile(path, dtype='float64')
+            except OSError:
+                continue
+            rows = data['rows']
+            if len(history) < rows * width:
+                continue
+            if len(history) > rows * width:
+                # Rows appended after the last state write belong to no saved state
+                os.truncate(path, rows * width * history.itemsize)
+                history = history[:rows * width]
+            self.symbols[symbol] = SymbolIndicators.from_json(data, history.reshape(rows, width))
+
+    def _save(self, rebuilt, extended):
+        for symbol in rebuilt:
+            path = self._history_path(symbol)
+            tmp_path = f"{path}.tmp"
+            self.symbols[symbol].history().tofile(tmp_path)
+            os.replace(tmp_path, path)
+        for symbol, start in extended.items():
+            with open(self._history_path(symbol), 'ab') as f:
+                f.write(self.symbols[symbol].history()[start:].tobytes())
+
+        # State is written last, so it never points past its history files
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({
+                'version': STATE_VERSION,
+                'columns': INDICATOR_COLUMNS,
+                'symbols': {symbol: state.to_json() for symbol, state in self.symbols.items()}
+            }, f)
+        os.replace(tmp_path, self.state_path)
+
+    def update(self, price_df):
+        """Bring every symbol up to date with a timestamp-sorted price frame"""
+        with self.lock:
+            rebuilt, extended = [], {}
+            seen = set()
+            for symbol, rows in price_df.groupby('symbol', sort=False, observed=True):
+                symbol = str(symbol)
+                seen.add(symbol)
+                times = rows['timestamp'].to_numpy(dtype='datetime64[ns]').astype(np.int64)
+                prices = rows['price'].to_numpy(dtype='float64')
+                closed = len(prices) - 1
+                hashes = _row_hashes(times[:closed], prices[:closed])
+                state = self.symbols.get(symbol)
+
+                if state is None or state.rows > closed or not state.continues(hashes):
+                    # New symbol, or processed rows changed: rebuild it
+                    state = self.symbols[symbol] = SymbolIndicators.bootstrap(prices[:closed], hashes)
+                    rebuilt.append(symbol)
+                elif state.rows < closed:
+                    extended[symbol] = state.rows
+                    state.extend(prices[:closed], hashes)
+                state.tail = state.peek(prices[-1])
+
+            removed = set(self.symbols) - seen
+            for symbol in removed:
+                del self.symbols[symbol]
+                if os.path.exists(self._history_path(symbol)):
+                    os.remove(self._history_path(symbol))
+            if rebuilt or extended or removed:
+                self._save(rebuilt, extended)
+        return self
+
+    def frames(self, price_df):
+        """Symbol -> timestamp-indexed price rows with indicator columns"""
+        self.update(price_df)
+        frames = {}
+        with self.lock:
+            for symbol, rows in price_df.groupby('symbol', sort=False, observed=True):
+                state = self.symbols[str(symbol)]
+                history = np.vstack([state.history(), state.tail])
+                frames[symbol] = rows.assign(**{
+                    name: history[:, i] for i, name in enumerate(INDICATOR_COLUMNS)
+                }).set_index('timestamp')
+        return frames
+
+
+def indicators_by_symbol(bars, bucket_name, interval):
+    """Symbol -> bars with indicators, reused while the price version is unchanged"""
+    if bars.empty:
+        return {}
+    engine = get_indicator_engine(bucket_name, interval)
+    return per_version(f'indicators:{interval}', bars, engine.frames)
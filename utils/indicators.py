@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Technical indicators
+SMA/EMA/RSI/Bollinger/MACD for every symbol of the price frame at once, using
+grouped rolling and ewm windows
+"""
+
+import pandas as pd
+
+SMA_WINDOWS = (7, 21)
+EMA_SPANS = (12, 26)
+RSI_WINDOW = 14
+BB_WINDOW = 20
+BB_STD = 2
+MACD_SIGNAL_SPAN = 9
+
+INDICATOR_COLUMNS = [
+    'SMA_7', 'SMA_21', 'EMA_12', 'EMA_26', 'RSI',
+    'BB_Upper', 'BB_Middle', 'BB_Lower',
+    'MACD', 'MACD_Signal', 'MACD_Histogram'
+]
+
+
+def _ungroup(result):
+    # Grouped window results are indexed (symbol, row); put them back in row order
+    return result.droplevel(0).sort_index()
+
+
+def compute_indicators(price_df, column='price'):
+    """Indicator columns for every row, each computed within its own symbol's series"""
+    symbols = price_df['symbol'].astype(object).to_numpy()
+    prices = pd.Series(price_df[column].to_numpy(dtype='float64'))
+    by_symbol = prices.groupby(symbols, sort=False)
+
+    def sma(window):
+        return _ungroup(by_symbol.rolling(window).mean())
+
+    def ema(series, span):
+        return _ungroup(series.groupby(symbols, sort=False).ewm(span=span).mean())
+
+    indicators = pd.DataFrame(index=prices.index)
+    for window in SMA_WINDOWS:
+        indicators[f'SMA_{window}'] = sma(window)
+    for span in EMA_SPANS:
+        indicators[f'EMA_{span}'] = ema(prices, span)
+
+    # RSI on Wilder-smoothed gains and losses: seeded with the mean of the first
+    # RSI_WINDOW changes, then avg += (change - avg) / RSI_WINDOW
+    delta = by_symbol.diff()
+    position = by_symbol.cumcount()
+
+    def wilder(values):
+        seed = _ungroup(values.groupby(symbols, sort=False).rolling(RSI_WINDOW).mean())
+        seeded = values.where(position > RSI_WINDOW, seed.where(position == RSI_WINDOW))
+        return _ungroup(seeded.groupby(symbols, sort=False).ewm(alpha=1 / RSI_WINDOW, adjust=False).mean())
+
+    gain = wilder(delta.where(delta > 0, 0))
+    loss = wilder(-delta.where(delta < 0, 0))
+    indicators['RSI'] = 100 - (100 / (1 + gain / loss))
+
+    middle = sma(BB_WINDOW)
+    std = _ungroup(by_symbol.rolling(BB_WINDOW).std())
+    indicators['BB_Upper'] = middle + std * BB_STD
+    indicators['BB_Middle'] = middle
+    indicators['BB_Lower'] = middle - std * BB_STD
+
+    indicators['MACD'] = indicators['EMA_12'] - indicators['EMA_26']
+    indicators['MACD_Signal'] = ema(indicators['MACD'], MACD_SIGNAL_SPAN)
+    indicators['MACD_Histogram'] = indicators['MACD'] - indicators['MACD_Signal']
+
+    indicators.index = price_df.index
+    return price_df.assign(**{name: indicators[name] for name in INDICATOR_COLUMNS})
+
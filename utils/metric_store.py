@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Historical metric store
+Splits the long-format historical frame once per data version into one
+date-sorted frame and float64 series per metric, so lookups need no scan
+"""
+
+import pandas as pd
+from utils.version_cache import per_version
+
+METRIC_COLUMNS = ['date', 'value']
+
+
+class MetricStore:
+    """Per-metric date/value frames and date-indexed series"""
+
+    def __init__(self, df):
+        self.source = df  # Long frame; its attrs version the store
+        self._frames = {}
+        self._series = {}
+        if df.empty or 'metric' not in df.columns:
+            return
+
+        for metric, rows in df.groupby('metric', observed=True, sort=False):
+            rows = rows[METRIC_COLUMNS]
+            if not rows['date'].is_monotonic_increasing:
+                rows = rows.sort_values('date', kind='stable')
+            rows = rows.reset_index(drop=True)
+            self._frames[metric] = rows
+            self._series[metric] = pd.Series(
+                rows['value'].to_numpy(dtype='float64'), index=pd.DatetimeIndex(rows['date']), name=metric
+            )
+
+    def metrics(self):
+        """Metric names in the store"""
+        return list(self._frames)
+
+    def frame(self, metric):
+        """Date-sorted date/value rows of one metric (empty if absent)
+
+        Callers get a shallow copy, so added columns stay out of the store.
+        """
+        rows = self._frames.get(metric)
+        if rows is None:
+            return pd.DataFrame(columns=METRIC_COLUMNS)
+        return rows.copy(deep=False)
+
+    def series(self, metric):
+        """Date-indexed float64 values of one metric (empty if absent)"""
+        return self._series.get(metric, pd.Series(dtype='float64', name=metric))
+
+    def aligned(self, *metrics):
+        """One column per metric on the first metric's dates, others as of each date
+
+        Metrics published less often (e.g. monthly M2) carry their last known
+        value forward; dates before a metric's first value stay NaN.
+        """
+        columns = {}
+        index = None
+        for metric in metrics:
+            values = self.series(metric)
+            values = values[~values.index.duplicated(keep='last')]
+            if index is None:
+                index = values.index
+                columns[metric] = values
+            else:
+                columns[metric] = values.reindex(index, method='ffill')
+        return pd.DataFrame(columns, index=index)
+
+
+def metric_store(df):
+    """MetricStore for the historical frame, reused while its dataset version is unchanged"""
+    return per_version('metric_store', df, MetricStore)
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Price bars
+Per-symbol OHLC bars at fixed intervals from the raw price rows, so charts and
+indicators run on bounded, regularly spaced series
+"""
+
+import pandas as pd
+import numpy as np
+from utils.version_cache import per_version
+
+# Interval label -> pandas frequency
+BAR_INTERVALS = {'5m': '5min', '1h': 'h', '1d': 'D'}
+
+BAR_COLUMNS = ['timestamp', 'symbol', 'open', 'high', 'low', 'close', 'mean', 'ticks', 'price', 'date']
+
+# Markets other than these follow US regular trading hours (holidays are not known)
+ALWAYS_OPEN_CATEGORIES = {'CRYPTO'}
+MARKET_TZ = 'America/New_York'
+SESSION_MINUTES = (9 * 60 + 30, 16 * 60)
+
+# Longer runs of empty open intervals are collector outages and stay empty
+FILL_LIMIT_BARS = 12
+MAX_CLOSURE = pd.Timedelta(days=4)  # Longest market closure (weekend plus holidays)
+
+
+def market_open(starts, step):
+    """Whether each interval of length step starting at starts overlaps US regular trading hours"""
+    if step >= pd.Timedelta(days=1):
+        return np.asarray(starts.weekday < 5)
+    local = (starts if starts.tz is not None else starts.tz_localize('UTC')).tz_convert(MARKET_TZ)
+    minutes = np.asarray(local.hour * 60 + local.minute)
+    length = step / pd.Timedelta(minutes=1)
+    session_start, session_end = SESSION_MINUTES
+    return np.asarray(local.weekday < 5) & (minutes < session_end) & (minutes + length > session_start)
+
+
+def ohlc_bars(price_df, interval):
+    """One row per symbol and interval start, sorted by bar time; price is the close
+
+    Empty intervals between a symbol's bars become flat bars at the previous
+    close with zero ticks while its market is open, so window-based
+    indicators count in intervals; closed-market intervals and outages
+    longer than FILL_LIMIT_BARS get no bars.
+    """
+    if price_df.empty or 'timestamp' not in price_df.columns:
+        return pd.DataFrame(columns=BAR_COLUMNS)
+
+    frequency = BAR_INTERVALS[interval]
+    step = pd.Timedelta(pd.tseries.frequencies.to_offset(frequency))
+    rows = price_df[price_df['timestamp'].notna()]
+    bar_start = rows['timestamp'].dt.floor(frequency)
+    # Rows are time-sorted, so first/last within a group are the open/close
+    bars = rows.groupby([rows['symbol'], bar_start], observed=True, sort=True)['price'].agg(
+        open='first', high='max', low='min', close='last', mean='mean', ticks='size'
+    ).reset_index()
+
+    if 'category' in rows.columns:
+        categories = rows.groupby('symbol', observed=True)['category'].last().astype(object)
+        always_open = bars['symbol'].astype(object).map(categories).isin(ALWAYS_OPEN_CATEGORIES).to_numpy()
+    else:
+        always_open = np.ones(len(bars), dtype=bool)
+
+    # Empty intervals after each bar, up to the symbol's next bar
+    symbols = pd.factorize(bars['symbol'])[0]
+    same_symbol = np.append(symbols[1:] == symbols[:-1], False)
+    gaps = (bars['timestamp'].shift(-1) - bars['timestamp']) / step - 1
+    gaps = np.where(same_symbol, gaps.fillna(0), 0).astype('int64')
+    gaps[gaps > (MAX_CLOSURE + FILL_LIMIT_BARS * step) / step] = 0
+
+    after = np.repeat(np.arange(len(bars)), gaps)
+    offsets = np.arange(len(after)) - np.repeat(np.cumsum(gaps) - gaps, gaps) + 1
+    starts = pd.DatetimeIndex(bars['timestamp']).take(after) + step * offsets
+    is_open = always_open[after] | market_open(starts, step)
+    open_gaps = np.bincount(after[is_open], minlength=len(bars))
+    fill = is_open & (open_gaps[after] <= FILL_LIMIT_BARS)
+    after, starts = after[fill], starts[fill]
+
+    closes = bars['close'].groupby(symbols).ffill().to_numpy()[after]
+    flat = pd.DataFrame({
+        'timestamp': starts,
+        'symbol': bars['symbol'].iloc[after].to_numpy(),
+        **{column: closes for column in ('open', 'high', 'low', 'close', 'mean')},
+        'ticks': np.zeros(len(after), dtype='int64')
+    })
+    flat['symbol'] = flat['symbol'].astype(bars['symbol'].dtype)
+    bars = pd.concat([bars, flat], ignore_index=True)
+    bars = bars.sort_values(['timestamp', 'symbol'], kind='stable', ignore_index=True)
+    bars['price'] = bars['close']
+    bars['date'] = bars['timestamp'].dt.normalize()
+
+    version = price_df.attrs.get('source_version')
+    if version is not None:
+        bars.attrs['source_version'] = f"{version}/{interval}"
+    return bars[BAR_COLUMNS]
+
+
+def price_bars(price_df, interval):
+    """OHLC bars for a loader frame, reused while its price version is unchanged"""
+    return per_version(f'price_bars:{interval}', price_df, lambda df: ohlc_bars(df, interval))
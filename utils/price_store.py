@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Incremental price store
+Append-only local Parquet partitions of already-ingested S3 price objects
+"""
+
+import pandas as pd
+import json
+import os
+import threading
+from utils.s3_manifest import CACHE_DIR
+
+# Merge partitions into one once there are more than this many
+MAX_PARTS = 64
+
+_registry_lock = threading.Lock()
+_stores = {}
+
+
+def get_price_store(bucket_name):
+    """Return the shared price store for a bucket"""
+    with _registry_lock:
+        if bucket_name not in _stores:
+            _stores[bucket_name] = PriceStore(os.path.join(CACHE_DIR, 'price_store', bucket_name))
+        return _stores[bucket_name]
+
+
+class PriceStore:
+    def __init__(self, root):
+        self.root = root
+        self.ledger_path = os.path.join(root, 'ledger.json')
+        self.lock = threading.RLock()
+        self.ledger = {}    # S3 key -> {'etag': ..., 'part': partition file name}
+        self.next_part = 0
+        self._frame = None  # Combined frame, valid until partitions change
+        self._load()
+
+    def _load(self):
+        """Load the ledger and drop partitions it does not reference"""
+        os.makedirs(self.root, exist_ok=True)
+        try:
+            with open(self.ledger_path) as f:
+                data = json.load(f)
+            self.ledger = data.get('objects', {})
+            self.next_part = data.get('next_part', 0)
+        except (OSError, ValueError):
+            self.ledger = {}
+            self.next_part = 0
+
+        # A crash between writing a partition and the ledger leaves an orphan
+        referenced = {entry['part'] for entry in self.ledger.values()}
+        for name in self._part_files():
+            if name not in referenced:
+                os.remove(os.path.join(self.root, name))
+
+    def _save_ledger(self):
+        tmp_path = f"{self.ledger_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'next_part': self.next_part, 'objects': self.ledger}, f)
+        os.replace(tmp_path, self.ledger_path)
+
+    def _part_files(self):
+        return sorted(name for name in os.listdir(self.root) if name.endswith('.parquet'))
+
+    def _write_part(self, df):
+        name = f"part-{self.next_part:06d}.parquet"
+        self.next_part += 1
+        df.to_parquet(os.path.join(self.root, name), index=False)
+        return name
+
+    def pending(self, entries):
+        """Manifest entries that are new or whose ETag changed since ingestion"""
+        with self.lock:
+            return [
+                entry for entry in entries
+                if self.ledger.get(entry['Key'], {}).get('etag') != entry['ETag']
+            ]
+
+    def _drop_keys(self, keys):
+        """Rewrite partitions that hold rows from re-uploaded or deleted objects"""
+        affected = {}
+        for key in keys:
+            part = self.ledger.pop(key, {}).get('part')
+            if part:
+                affected.setdefault(part, set()).add(key)
+
+        for part, part_keys in affected.items():
+            path = os.path.join(self.root, part)
+            df = pd.read_parquet(path)
+            remaining = df[~df['_source_key'].isin(part_keys)]
+            os.remove(path)
+            if not remaining.empty:
+                new_part = self._write_part(remaining)
+                for key in remaining['_source_key'].unique():
+                    self.ledger[key]['part'] = new_part
+
+    def retain(self, entries):
+        """Forget objects that are no longer in the manifests (deleted or renamed in S3)"""
+        with self.lock:
+            current = {entry['Key'] for entry in entries}
+            gone = [key for key in self.ledger if key not in current]
+            if gone:
+                self._drop_keys(gone)
+                self._save_ledger()
+                self._frame = None
+            return gone
+
+    def append(self, entries, frames):
+        """Append freshly fetched objects as one new partition"""
+        with self.lock:
+            stale = [entry['Key'] for entry in entries if entry['Key'] in self.ledger]
+            if stale:
+                self._drop_keys(stale)
+
+            tagged = [
+                frame.assign(_source_key=entry['Key'])
+                for entry, frame in zip(entries, frames)
+                if not frame.empty
+            ]
+            part = None
+            if tagged:
+                batch = pd.concat(tagged, ignore_index=True, sort=False)
+                if 'timestamp' in batch.columns:
+                    batch['timestamp'] = pd.to_datetime(batch['timestamp'])
+                part = self._write_part(batch)
+
+            for entry in entries:
+                self.ledger[entry['Key']] = {'etag': entry['ETag'], 'part': part}
+
+            if entries:
+                self._save_ledger()
+                self._frame = None
+                if len(self._part_files()) > MAX_PARTS:
+                    self.compact()
+
+    def compact(self):
+        """Merge all partitions into a single file"""
+        with self.lock:
+            parts = self._part_files()
+            if len(parts) <= 1:
+                return
+            combined = self._read_parts(parts)
+            new_part = self._write_part(combined)
+            for entry in self.ledger.values():
+                if entry['part'] is not None:
+                    entry['part'] = new_part
+            self._save_ledger()
+            for name in parts:
+                os.remove(os.path.join(self.root, name))
+            self._frame = None
+
+    def _read_parts(self, parts):
+        frames = [pd.read_parquet(os.path.join(self.root, name)) for name in parts]
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, ignore_index=True, sort=False)
+
+    def read(self):
+        """All stored price rows (without the ingestion bookkeeping column)"""
+        with self.lock:
+            if self._frame is None:
+                self._frame = self._read_parts(self._part_files())
+            return self._frame.drop(columns=['_source_key'], errors='ignore')
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Concurrent S3 fetch engine
+Downloads and parses many S3 objects in parallel over one pooled client
+"""
+
+import boto3
+from botocore.config import Config
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+import os
+
+DEFAULT_CONCURRENCY = int(os.getenv('S3_FETCH_CONCURRENCY', '16'))
+
+# Latest fetch summary per dataset label, shown on the debug page
+FETCH_STATS = {}
+
+_client_lock = threading.Lock()
+_shared_client = None
+
+
+def get_s3_client():
+    """Return the process-wide S3 client (thread-safe, pooled connections)"""
+    global _shared_client
+    with _client_lock:
+        if _shared_client is None:
+            _shared_client = boto3.client(
+                's3',
+                config=Config(
+                    max_pool_connections=max(DEFAULT_CONCURRENCY, 10),
+                    # Bounded timeouts also bound how long a vote log PUT can take
+                    connect_timeout=10,
+                    read_timeout=30,
+                    retries={'max_attempts': 5, 'mode': 'adaptive'}
+                )
+            )
+        return _shared_client
+
+
+class S3Fetcher:
+    def __init__(self, bucket_name, client=None, max_workers=None):
+        self.s3_client = client or get_s3_client()
+        self.bucket_name = bucket_name
+        self.max_workers = max_workers or DEFAULT_CONCURRENCY
+
+    def _fetch_one(self, key, parse):
+        """Download and parse a single object, timing both stages"""
+        start = time.perf_counter()
+        response = self.s3_client.get_object(Bucket=self.bucket_name, Key=key)
+        body = response['Body'].read()
+        fetched = time.perf_counter()
+        result = parse(body)
+        parsed = time.perf_counter()
+
+        stats = {
+            'key': key,
+            'bytes': len(body),
+            'fetch_seconds': fetched - start,
+            'parse_seconds': parsed - fetched
+        }
+        return result, stats
+
+    def fetch(self, keys, parse, label=None):
+        """Fetch and parse keys concurrently, returning results in key order"""
+        keys = list(keys)
+        if not keys:
+            return []
+
+        start = time.perf_counter()
+        workers = min(self.max_workers, len(keys))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(self._fetch_one, key, parse) for key in keys]
+            # Surface the first failure like the old serial loop did
+            outcomes = [future.result() for future in futures]
+
+        results = [result for result, _ in outcomes]
+        object_stats = [stats for _, stats in outcomes]
+
+        if label:
+            FETCH_STATS[label] = {
+                'objects': len(keys),
+                'concurrency': workers,
+                'bytes': sum(s['bytes'] for s in object_stats),
+                'wall_seconds': time.perf_counter() - start,
+                'fetch_seconds': sum(s['fetch_seconds'] for s in object_stats),
+                'parse_seconds': sum(s['parse_seconds'] for s in object_stats),
+                'slowest_key': max(object_stats, key=lambda s: s['fetch_seconds'] + s['parse_seconds'])['key'],
+                'objects_detail': object_stats
+            }
+
+        return results
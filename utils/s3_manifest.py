@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+S3 prefix manifest
+Keeps a local, incrementally refreshed index of the objects under a prefix
+"""
+
+from bisect import bisect_right, insort
+import json
+import os
+import threading
+import time
+from utils.s3_fetcher import get_s3_client
+
+CACHE_DIR = os.getenv(
+    'DATA_CACHE_DIR',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.cache')
+)
+
+# Incremental refreshes only see keys sorting after the last one seen, so
+# overwritten or deleted objects are picked up by a periodic full re-list;
+# callers that need every ETag and deletion to be current pass full=True
+FULL_RESYNC_SECONDS = 300
+
+_registry_lock = threading.Lock()
+_manifests = {}
+
+
+def get_manifest(bucket_name, prefix):
+    """Return the shared manifest for a bucket/prefix pair"""
+    with _registry_lock:
+        key = (bucket_name, prefix)
+        if key not in _manifests:
+            _manifests[key] = S3Manifest(bucket_name, prefix)
+        return _manifests[key]
+
+
+class S3Manifest:
+    def __init__(self, bucket_name, prefix, client=None, cache_dir=None):
+        self.s3_client = client or get_s3_client()
+        self.bucket_name = bucket_name
+        self.prefix = prefix
+        self.path = os.path.join(
+            cache_dir or CACHE_DIR, 'manifests', f"{bucket_name}__{prefix.replace('/', '__')}.json"
+        )
+        self.entries = {}     # key -> {'Key', 'Size', 'ETag', 'LastModified'}
+        self._keys = []       # keys in lexical order (listing order)
+        self._by_time = []    # (LastModified epoch, key) in time order
+        self.last_full_sync = 0.0
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        """Load the persisted index, if any"""
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        self.last_full_sync = data.get('last_full_sync', 0.0)
+        self._rebuild(data.get('entries', []))
+
+    def _save(self):
+        """Persist the index atomically"""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({
+                'last_full_sync': self.last_full_sync,
+                'entries': [self.entries[key] for key in self._keys]
+            }, f)
+        os.replace(tmp_path, self.path)
+
+    def _rebuild(self, entries):
+        self.entries = {entry['Key']: entry for entry in entries}
+        self._keys = sorted(self.entries)
+        self._by_time = sorted((entry['LastModified'], key) for key, entry in self.entries.items())
+
+    def _add(self, entry):
+        key = entry['Key']
+        if key in self.entries:
+            old = self.entries[key]
+            self._by_time.remove((old['LastModified'], key))
+        else:
+            insort(self._keys, key)
+        self.entries[key] = entry
+        insort(self._by_time, (entry['LastModified'], key))
+
+    def _list(self, start_after=None):
+        """Yield every object under the prefix, following all pages"""
+        params = {'Bucket': self.bucket_name, 'Prefix': self.prefix}
+        if start_after:
+            params['StartAfter'] = start_after
+        paginator = self.s3_client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(**params):
+            for obj in page.get('Contents', []):
+                yield {
+                    'Key': obj['Key'],
+                    'Size': obj['Size'],
+                    'ETag': obj['ETag'].strip('"'),
+                    'LastModified': obj['LastModified'].timestamp()
+                }
+
+    def refresh(self, full=False):
+        """Pick up new objects; re-list everything when full or stale
+
+        A full re-list replaces the index, so overwritten objects get their
+        new ETag/LastModified and deleted ones drop out.
+        """
+        with self._lock:
+            if full or not self._keys or time.time() - self.last_full_sync > FULL_RESYNC_SECONDS:
+                self._rebuild(list(self._list()))
+                self.last_full_sync = time.time()
+                self._save()
+                return self
+
+            new_entries = list(self._list(start_after=self._keys[-1]))
+            for entry in new_entries:
+                self._add(entry)
+            if new_entries:
+                self._save()
+            return self
+
+    def keys(self):
+        """All keys in listing order"""
+        with self._lock:
+            return list(self._keys)
+
+    def objects(self):
+        """All entries in listing order"""
+        with self._lock:
+            return [self.entries[key] for key in self._keys]
+
+    def get(self, key):
+        return self.entries.get(key)
+
+    def latest(self):
+        """Most recently modified object, or None"""
+        with self._lock:
+            if not self._by_time:
+                return None
+            return self.entries[self._by_time[-1][1]]
+
+    def newer_than(self, timestamp):
+        """Objects modified strictly after timestamp (datetime or epoch), oldest first"""
+        if hasattr(timestamp, 'timestamp'):
+            timestamp = timestamp.timestamp()
+        with self._lock:
+            start = bisect_right(self._by_time, (timestamp, chr(0x10FFFF)))
+            return [self.entries[key] for _, key in self._by_time[start:]]
+
+    def __len__(self):
+        return len(self._keys)
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Dataset schema registry
+Declares compact column dtypes per dataset, applied once at load time
+"""
+
+import pandas as pd
+
+# Column kinds:
+#   'category'  - low-cardinality labels (pandas categorical)
+#   'float32'   - scores and ratios where 7 significant digits are plenty
+#   'float64'   - prices, volumes and raw metric values
+#   'timestamp' - event times, parsed to datetime64[ns, UTC]
+#   'date'      - calendar dates, parsed to naive datetime64[ns]
+#   'text'      - free text, left as object
+SCHEMAS = {
+    'processed': {
+        'timestamp': 'timestamp',
+        'title': 'text',
+        'content': 'text',
+        'url': 'text',
+        'category': 'category',
+        'sentiment_label': 'category',
+        'subreddit': 'category',
+        'source': 'category',
+        'platform': 'category',
+        'author_handle': 'category',
+        'sentiment_score': 'float32'
+    },
+    'historical': {
+        'date': 'date',
+        'metric': 'category',
+        'value': 'float64'
+    },
+    'price': {
+        'timestamp': 'timestamp',
+        'symbol': 'category',
+        'category': 'category',
+        'price': 'float64',
+        'change_24h': 'float32',
+        'volume_24h': 'float64',
+        'volatility': 'float32',
+        'volume_price_ratio': 'float32',
+        'market_cap': 'float64'
+    },
+    'fear_greed': {
+        'timestamp': 'timestamp',
+        'fear_greed_classification': 'category'
+    },
+    'trending': {
+        'detected_at': 'timestamp',
+        'symbol': 'category',
+        'alert_level': 'category',
+        'composite_score': 'float32',
+        'reason': 'text',
+        'risk_warning': 'text',
+        'individual_scores': 'text'
+    }
+}
+
+
+# Event-time column per dataset; loaders sort on it and add a 'date' bucket
+TIME_COLUMNS = {
+    'processed': 'timestamp',
+    'historical': 'date',
+    'price': 'timestamp',
+    'fear_greed': 'timestamp',
+    'trending': 'detected_at'
+}
+
+
+def _to_datetime(series, utc):
+    if pd.api.types.is_datetime64_any_dtype(series):
+        if not utc:
+            return series
+        return series.dt.tz_localize('UTC') if series.dt.tz is None else series.dt.tz_convert('UTC')
+    try:
+        return pd.to_datetime(series, utc=utc)
+    except (ValueError, TypeError):
+        # Files written by different collector versions mix formats
+        return pd.to_datetime(series, utc=utc, format='mixed', errors='coerce')
+
+
+def _convert(series, kind):
+    if kind == 'category':
+        return series if isinstance(series.dtype, pd.CategoricalDtype) else series.astype('category')
+    if kind in ('float32', 'float64'):
+        if series.dtype == kind:
+            return series
+        return pd.to_numeric(series, errors='coerce').astype(kind)
+    if kind == 'timestamp':
+        return _to_datetime(series, utc=True)
+    if kind == 'date':
+        return _to_datetime(series, utc=False)
+    return series
+
+
+def apply_schema(df, dataset):
+    """Convert the dataset's declared columns in place and return the frame"""
+    for column, kind in SCHEMAS.get(dataset, {}).items():
+        if column in df.columns:
+            df[column] = _convert(df[column], kind)
+    return df
+
+
+def add_time_buckets(df, dataset):
+    """Sort by the dataset's event time and add a UTC-midnight 'date' column"""
+    column = TIME_COLUMNS.get(dataset)
+    if column is None or column not in df.columns:
+        return df
+    if not df[column].is_monotonic_increasing:
+        df = df.sort_values(column, kind='stable', ignore_index=True)
+    # Cached frames already carry the bucket; a raw 'date' column is replaced
+    if column != 'date' and not isinstance(df.get('date', pd.Series(dtype=object)).dtype, pd.DatetimeTZDtype):
+        df['date'] = df[column].dt.normalize()
+    return df
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Sentiment aggregate cube
+Post counts and score sums per hour x category x coin x platform x sentiment
+label, built once per processed-data version; charts query the cube instead
+of grouping raw posts
+"""
+
+import pandas as pd
+import numpy as np
+from utils.coin_attribution import coin_labels
+from utils.version_cache import per_version
+from utils.views import SENTIMENT_CATEGORY_MAP
+
+UNLABELLED = 'unlabelled'  # Posts without a sentiment label
+NO_COIN = 'NONE'           # Coin for non-CRYPTO posts
+MISSING = ''               # Missing category/platform
+
+DIMENSIONS = ['hour', 'category', 'coin', 'platform', 'sentiment_label']
+
+
+def aggregate(rows):
+    """Cube cells for a set of posts"""
+    if rows.empty or 'timestamp' not in rows.columns:
+        return pd.DataFrame(columns=DIMENSIONS + ['count', 'score_sum', 'score_count', 'date', 'sentiment_category'])
+
+    def column(name, missing):
+        if name not in rows.columns:
+            return np.full(len(rows), missing, dtype=object)
+        return rows[name].astype(object).fillna(missing).to_numpy(dtype=object)
+
+    category = column('category', MISSING)
+    coin = np.full(len(rows), NO_COIN, dtype=object)
+    crypto = category == 'CRYPTO'
+    if crypto.any():
+        coin[crypto] = np.asarray(coin_labels(rows[crypto]), dtype=object)
+
+    keys = pd.DataFrame({
+        'hour': rows['timestamp'].dt.floor('h').array,
+        'category': category,
+        'coin': coin,
+        'platform': column('platform', MISSING),
+        'sentiment_label': column('sentiment_label', UNLABELLED),
+        'score': rows['sentiment_score'].to_numpy(dtype='float64') if 'sentiment_score' in rows.columns else np.nan
+    })
+    # NaT hours are kept so totals still cover every post
+    cells = keys.groupby(DIMENSIONS, sort=False, dropna=False).agg(
+        count=('score', 'size'),
+        score_sum=('score', 'sum'),
+        score_count=('score', 'count')
+    ).reset_index()
+    cells['date'] = cells['hour'].dt.floor('D')
+    cells['sentiment_category'] = cells['sentiment_label'].map(SENTIMENT_CATEGORY_MAP)
+    return cells
+
+
+class SentimentCube:
+    """Hourly sentiment cells for one processed-data frame"""
+
+    def __init__(self, df):
+        self.all_cells = aggregate(df)
+
+    def cells(self):
+        """Cells for every post"""
+        return self.all_cells
+
+
+def sentiment_cube(df):
+    """SentimentCube for a loader frame, reused while its dataset version is unchanged"""
+    return per_version('sentiment_cube', df, SentimentCube)
+
+
+def post_count(cells):
+    """Posts covered by a set of cells"""
+    return int(cells['count'].sum())
+
+
+def sentiment_counts(cells, by, column='sentiment_category'):
+    """Post counts with one row per by-group and one column per sentiment value
+
+    Unlabelled posts are left out, like a groupby on the raw label column.
+    """
+    counts = cells.groupby(list(by) + [column], observed=True)['count'].sum()
+    return counts.unstack(fill_value=0)
+
+
+def mean_score(cells):
+    """Mean sentiment score over the posts in cells"""
+    scored = cells['score_count'].sum()
+    return cells['score_sum'].sum() / scored if scored else np.nan
+
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Sentiment timeline
+Cumulative sentiment-bucket counts over sorted post times, per category, coin
+and platform, so any [start, end) window is two binary searches
+"""
+
+import pandas as pd
+import numpy as np
+from utils.coin_attribution import coin_labels, COIN_TERMS, OTHER_COIN
+from utils.sentiment_cube import MISSING
+from utils.version_cache import per_version
+from utils.views import SENTIMENT_CATEGORY_MAP
+
+BUCKETS = ['Bullish', 'Neutral', 'Bearish', 'Unlabelled']
+SENTIMENT_BUCKETS = BUCKETS[:3]
+SENTIMENT_POSITIONS = [BUCKETS.index(bucket) for bucket in SENTIMENT_BUCKETS]
+COINS = list(COIN_TERMS) + [OTHER_COIN]
+
+# Weight of neutral posts in every gauge needle
+NEUTRAL_WEIGHT = 0.5
+
+
+def _bucket_codes(df):
+    if 'sentiment_label' not in df.columns:
+        return np.full(len(df), BUCKETS.index('Unlabelled'), dtype=np.int64)
+    buckets = df['sentiment_label'].astype(object).map(SENTIMENT_CATEGORY_MAP).fillna('Unlabelled')
+    return buckets.map({bucket: i for i, bucket in enumerate(BUCKETS)}).to_numpy(dtype=np.int64)
+
+
+def _labels(df, column):
+    if column not in df.columns:
+        return np.full(len(df), MISSING, dtype=object)
+    return df[column].astype(object).fillna(MISSING).to_numpy(dtype=object)
+
+
+class SentimentTimeline:
+    """Prefix sums of sentiment buckets over time for all posts and per group
+
+    Groups are keyed ('category', name), ('coin', name) or ('platform', name);
+    None is every post. Posts without a timestamp are left out.
+    """
+
+    def __init__(self, df):
+        self._series = {}
+        if df.empty or 'timestamp' not in df.columns:
+            self._add(None, np.array([], dtype=np.int64), np.array([], dtype=np.int64))
+            return
+
+        df = df[df['timestamp'].notna()]
+        if not df['timestamp'].is_monotonic_increasing:
+            df = df.sort_values('timestamp', kind='stable')
+        times = df['timestamp'].to_numpy(dtype='datetime64[ns]').astype(np.int64)
+        codes = _bucket_codes(df)
+        self._add(None, times, codes)
+
+        categories = _labels(df, 'category')
+        for category in pd.unique(categories):
+            mask = categories == category
+            self._add(('category', category), times[mask], codes[mask])
+
+        crypto = categories == 'CRYPTO'
+        if crypto.any():
+            coins = np.asarray(coin_labels(df[crypto]), dtype=object)
+            for coin in COINS:
+                mask = coins == coin
+                if mask.any():
+                    self._add(('coin', coin), times[crypto][mask], codes[crypto][mask])
+
+        platforms = _labels(df, 'platform')
+        for platform in pd.unique(platforms):
+            mask = platforms == platform
+            self._add(('platform', platform), times[mask], codes[mask])
+
+    def _add(self, group, times, codes):
+        cumulative = np.zeros((len(times) + 1, len(BUCKETS)), dtype=np.int64)
+        if len(times):
+            np.cumsum(np.eye(len(BUCKETS), dtype=np.int64)[codes], axis=0, out=cumulative[1:])
+        self._series[group] = (times, cumulative)
+
+    def groups(self, kind):
+        """Names of the groups of one kind, in first-seen order"""
+        return [group[1] for group in self._series if group is not None and group[0] == kind]
+
+    def counts(self, group=None, start=None, end=None):
+        """Posts per bucket (Bullish, Neutral, Bearish, Unlabelled) in [start, end)"""
+        if group not in self._series:
+            return np.zeros(len(BUCKETS), dtype=np.int64)
+        times, cumulative = self._series[group]
+        lo = np.searchsorted(times, pd.Timestamp(start).value, side='left') if start is not None else 0
+        hi = np.searchsorted(times, pd.Timestamp(end).value, side='left') if end is not None else len(times)
+        return cumulative[max(hi, lo)] - cumulative[lo]
+
+
+def sentiment_timeline(df):
+    """SentimentTimeline for a loader frame, reused while its dataset version is unchanged"""
+    return per_version('sentiment_timeline', df, SentimentTimeline)
+
+
+def window_shares(counts, include_unlabelled=False):
+    """Bullish/Neutral/Bearish % for a bucket count vector
+
+    With include_unlabelled, posts without a label count towards the total.
+    """
+    labelled = labelled_counts(counts)
+    total = counts.sum() if include_unlabelled else labelled.sum()
+    if total == 0:
+        return pd.Series(0.0, index=SENTIMENT_BUCKETS)
+    return labelled / total * 100
+
+
+def labelled_counts(counts):
+    """Bullish/Neutral/Bearish counts of a bucket count vector, by name"""
+    return pd.Series(counts[SENTIMENT_POSITIONS], index=SENTIMENT_BUCKETS)
+
+
+def needle(shares):
+    """Gauge needle: bullish % plus a weighted share of neutral %"""
+    return shares['Bullish'] + shares['Neutral'] * NEUTRAL_WEIGHT
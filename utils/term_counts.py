@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Term frequency engine
+Counts words across post titles and content in fixed-size vectorized chunks,
+cached per dataset version
+"""
+
+from collections import Counter
+from utils.ticker_mentions import post_text
+from utils.version_cache import per_version
+
+STOP_WORDS = {
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by',
+    'is', 'are', 'was', 'were', 'be', 'been', 'have', 'has', 'had', 'do', 'does', 'did', 'will',
+    'would', 'could', 'should', 'may', 'might', 'must', 'can', 'this', 'that', 'these', 'those',
+    'i', 'you', 'he', 'she', 'it', 'we', 'they', 'me', 'him', 'her', 'us', 'them', 'my', 'your',
+    'his', 'its', 'our', 'their', 'nan', 'none', 'null'
+}
+MIN_WORD_LENGTH = 3
+
+# Rows tokenized per chunk; bounds the exploded token table's size
+CHUNK_ROWS = 5000
+
+
+def tokenize(df):
+    """Lowercase non-stop-word tokens, one row each, indexed by the post's row position"""
+    text = post_text(df).reset_index(drop=True)
+    tokens = text.str.lower().str.findall(r'\w+').explode().dropna()
+    return tokens[(tokens.str.len() >= MIN_WORD_LENGTH) & ~tokens.isin(STOP_WORDS)]
+
+
+def chunk_counts(df):
+    """Term counts for one chunk of posts, in order of first appearance"""
+    return tokenize(df).value_counts(sort=False)
+
+
+def count_terms(df, chunk_rows=CHUNK_ROWS):
+    """Counter of non-stop-word terms over all posts"""
+    counts = Counter()
+    for start in range(0, len(df), chunk_rows):
+        # Counter keeps first-seen order, so most_common() breaks ties by
+        # first appearance in the frame
+        counts.update(chunk_counts(df.iloc[start:start + chunk_rows]).to_dict())
+    return counts
+
+
+def term_counts(df):
+    """count_terms for a loader frame, reused while its dataset version is unchanged"""
+    return per_version('term_counts', df, count_terms)
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Incremental term index
+Unigram and bigram counts bucketed by hour and category, keyed by interned
+term ids, so any time window's top terms come from merging a few buckets
+"""
+
+import pandas as pd
+import numpy as np
+import threading
+from utils.term_counts import CHUNK_ROWS, MIN_WORD_LENGTH, STOP_WORDS
+from utils.ticker_mentions import TEXT_COLUMNS
+from utils.version_cache import frame_key
+from utils.views import rows_between
+
+WINDOW_DAYS = 7  # Longest window the trending terms section queries
+HOUR_NS = 3_600_000_000_000
+# Columns whose values decide a post's counts; an hour is re-ingested when any change
+IDENTITY_COLUMNS = ('timestamp', 'category') + TEXT_COLUMNS
+
+_registry_lock = threading.Lock()
+_indexes = {}
+
+
+def get_term_index(name):
+    """Return the shared term index for a dataset"""
+    with _registry_lock:
+        if name not in _indexes:
+            _indexes[name] = TermIndex()
+        return _indexes[name]
+
+
+def _categories(df):
+    if 'category' in df.columns:
+        return df['category'].astype(object).fillna('UNKNOWN').to_numpy(dtype=object)
+    return np.full(len(df), 'UNKNOWN', dtype=object)
+
+
+def post_terms(df):
+    """(row positions, terms) of words and of bigrams, post by post in text order
+
+    Bigrams pair adjacent words of one field, taken before stop words are
+    removed, so they never span a stop word or the title/content boundary.
+    """
+    word_parts, pair_parts = [], []
+    for field, column in enumerate(TEXT_COLUMNS):
+        if column not in df.columns:
+            continue
+        text = df[column].astype(object).fillna('').astype(str).reset_index(drop=True)
+        tokens = text.str.lower().str.findall(r'\w+').explode().dropna()
+        if tokens.empty:
+            continue
+        positions = tokens.index.to_numpy()
+        values = tokens.to_numpy(dtype=object)
+        kept = ((tokens.str.len() >= MIN_WORD_LENGTH) & ~tokens.isin(STOP_WORDS)).to_numpy()
+        order = np.arange(len(values))
+        word_parts.append((positions[kept], np.full(kept.sum(), field), order[kept], values[kept]))
+
+        adjacent = (positions[:-1] == positions[1:]) & kept[:-1] & kept[1:]
+        pair_parts.append((
+            positions[:-1][adjacent], np.full(adjacent.sum(), field), order[:-1][adjacent],
+            values[:-1][adjacent] + ' ' + values[1:][adjacent]
+        ))
+
+    result = []
+    for parts in (word_parts, pair_parts):
+        if not parts:
+            result.append((np.empty(0, dtype=np.int64), np.empty(0, dtype=object)))
+            continue
+        positions, fields, order, terms = (np.concatenate(part) for part in zip(*parts))
+        # Title before content, so ties still go to the term seen first
+        ordered = np.lexsort((order, fields, positions))
+        result.append((positions[ordered], terms[ordered]))
+    return tuple(result)
+
+
+class TermTable:
+    """Sparse per-bucket counts over one interned vocabulary"""
+
+    def __init__(self):
+        self.terms = []     # term id -> term
+        self.ids = {}       # term -> term id
+        self.buckets = {}   # (hour ns, category) -> (sorted term ids, counts)
+
+    def intern(self, values):
+        """Global term ids for an array of terms, adding unseen ones"""
+        codes, uniques = pd.factorize(values)
+        ids = np.empty(len(uniques), dtype=np.int64)
+        for i, term in enumerate(uniques):
+            term_id = self.ids.get(term)
+            if term_id is None:
+                term_id = self.ids[term] = len(self.terms)
+                self.terms.append(term)
+            ids[i] = term_id
+        return ids[codes]
+
+    def add(self, hours, categories, terms):
+        """Count terms into their (hour, category) buckets"""
+        if not len(terms):
+            return
+        counts = pd.DataFrame({
+            'hour': hours,
+            'category': categories,
+            'term_id': self.intern(terms)
+        }).groupby(['hour', 'category', 'term_id'], sort=True).size()
+
+        for (hour, category), group in counts.groupby(level=['hour', 'category'], sort=False):
+            ids = group.index.get_level_values('term_id').to_numpy(dtype=np.int64)
+            values = group.to_numpy(dtype=np.int64)
+            existing = self.buckets.get((hour, category))
+            if existing is not None:
+                merged_ids, inverse = np.unique(np.concatenate([existing[0], ids]), return_inverse=True)
+                values = np.bincount(inverse, weights=np.concatenate([existing[1], values])).astype(np.int64)
+                ids = merged_ids
+            self.buckets[(hour, category)] = (ids, values)
+
+    def drop(self, hours):
+        """Remove every category's bucket for the given hours"""
+        self.buckets = {key: bucket for key, bucket in self.buckets.items() if key[0] not in hours}
+
+    def top(self, k, start_hour=None, categories=None, extra=()):
+        """(term, count) pairs for the k most frequent terms in the selected buckets plus extra terms"""
+        selected = [
+            bucket for (hour, category), bucket in self.buckets.items()
+            if (start_hour is None or hour >= start_hour) and (categories is None or category in categories)
+        ]
+        if len(extra):
+            extra_ids = self.intern(extra)
+            selected.append((extra_ids, np.ones(len(extra_ids), dtype=np.int64)))
+        if not selected:
+            return []
+        totals = np.bincount(
+            np.concatenate([ids for ids, _ in selected]),
+            weights=np.concatenate([values for _, values in selected]),
+            minlength=len(self.terms)
+        )
+        nonzero = np.flatnonzero(totals)
+        # Highest count first; ties go to the term seen first
+        order = nonzero[np.lexsort((nonzero, -totals[nonzero]))][:k]
+        return [(self.terms[i], int(totals[i])) for i in order]
+
+
+class TermIndex:
+    """Hour x category unigram/bigram counts, re-ingesting only hours whose posts changed
+
+    Each ingested hour keeps a fingerprint (row count and sum of row hashes)
+    of its posts, so late-arriving posts and replaced processed files are
+    picked up by rebuilding just the affected hours. Hours older than the
+    WINDOW_DAYS query window are evicted. A window's partial first hour is
+    counted from the last frame's rows, so windows are exact.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.words = TermTable()
+        self.bigrams = TermTable()
+        self.hours = {}     # hour ns -> (rows, row hash sum) of the posts ingested for it
+        self.source = None  # frame_key of the last frame ingested
+        self.frame = None   # Last frame ingested, for partial hours
+
+    def update(self, df, now=None):
+        """Bring the index in line with a frame's posts inside the query window"""
+        if df.empty or 'timestamp' not in df.columns:
+            return self
+        now = pd.Timestamp.now(tz='UTC') if now is None else pd.Timestamp(now)
+        first_hour = (now - pd.Timedelta(days=WINDOW_DAYS)).floor('h').value
+        key = frame_key(df)
+        with self.lock:
+            self._evict(first_hour)
+            if key == self.source:
+                return self
+
+            self.frame = df
+            df = df[df['timestamp'].notna()]
+            hours = df['timestamp'].to_numpy(dtype='datetime64[ns]').astype(np.int64) // HOUR_NS * HOUR_NS
+            recent = hours >= first_hour
+            df, hours = df[recent], hours[recent]
+            fingerprints = self._fingerprints(df, hours)
+
+            changed = {
+                hour for hour in fingerprints.keys() | self.hours.keys()
+                if fingerprints.get(hour) != self.hours.get(hour)
+            }
+            if changed:
+                self.words.drop(changed)
+                self.bigrams.drop(changed)
+                rows = np.isin(hours, list(changed))
+                df, hours = df[rows], hours[rows]
+                for start in range(0, len(df), CHUNK_ROWS):
+                    self._ingest(df.iloc[start:start + CHUNK_ROWS], hours[start:start + CHUNK_ROWS])
+                self.hours = fingerprints
+            self.source = key
+        return self
+
+    def _evict(self, first_hour):
+        """Drop hours that have left the query window"""
+        expired = {hour for hour in self.hours if hour < first_hour}
+        if expired:
+            self.words.drop(expired)
+            self.bigrams.drop(expired)
+            for hour in expired:
+                del self.hours[hour]
+
+    @staticmethod
+    def _fingerprints(df, hours):
+        """(row count, wrapping sum of row hashes) per hour"""
+        if not len(df):
+            return {}
+        columns = [column for column in IDENTITY_COLUMNS if column in df.columns]
+        hashes = pd.util.hash_pandas_object(df[columns], index=False).to_numpy(dtype=np.uint64)
+        codes, uniques = pd.factorize(hours)
+        sums = np.zeros(len(uniques), dtype=np.uint64)
+        np.add.at(sums, codes, hashes)
+        counts = np.bincount(codes, minlength=len(uniques))
+        return {int(hour): (int(count), int(total)) for hour, count, total in zip(uniques, counts, sums)}
+
+    def _ingest(self, chunk, hours):
+        categories = _categories(chunk)
+        for table, (positions, terms) in zip((self.words, self.bigrams), post_terms(chunk)):
+            table.add(hours[positions], categories[positions], terms)
+
+    def top_terms(self, k=10, since=None, categories=None, bigrams=False):
+        """Top k words (or bigrams) in posts from since onwards"""
+        table = self.bigrams if bigrams else self.words
+        with self.lock:
+            if since is None or self.frame is None:
+                return table.top(k, None, categories)
+            since = pd.Timestamp(since)
+            since = since.tz_localize('UTC') if since.tz is None else since.tz_convert('UTC')
+            first_full_hour = since.ceil('h')
+
+            # Buckets cover whole hours; the rest of since's hour comes from the rows
+            partial = rows_between(self.frame, since, first_full_hour)
+            positions, terms = post_terms(partial)[1 if bigrams else 0]
+            if categories is not None:
+                terms = terms[np.isin(_categories(partial)[positions], list(categories))]
+            return table.top(k, first_full_hour.value, categories, terms)
+
+    def categories(self):
+        """Categories present in the index"""
+        with self.lock:
+            return sorted({category for _, category in self.words.buckets})
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Ticker mention engine
+Extracts every pattern mention from post text in one vectorized regex pass
+into a long (post_id, label) table that counts and sentiment are grouped from,
+plus a cached post x label membership index per dataset version
+"""
+
+import pandas as pd
+import numpy as np
+import re
+from utils.version_cache import per_version
+
+TEXT_COLUMNS = ('title', 'content')
+BULLISH_LABELS = ['4 stars', '5 stars']
+
+# Tickers shown in the Insights page's Trending Tickers section
+TRENDING_TICKERS = ['GME', 'AMC', 'TSLA', 'AAPL', 'NVDA', 'MSFT', 'BTC', 'ETH', 'DOGE', 'SHIB', 'SPY', 'QQQ']
+
+TESLA_KEYWORDS = ['tesla', 'tsla', 'elon', 'musk', 'cybertruck', 'model 3', 'model y', 'model s', 'autopilot', 'fsd']
+
+# Stocks page: company-specific patterns for COIN/HOOD, plain symbol text otherwise
+STOCK_PATTERNS = {
+    'BLSH': 'blsh',
+    'RIVN': 'rivn',
+    'LCID': 'lcid',
+    'HOOD': r'robinhood|\$hood\b',
+    'COIN': r'coinbase|\$coin\b',
+    'RBLX': 'rblx',
+    'SNOW': 'snow',
+    'ABNB': 'abnb',
+    'UBER': 'uber'
+}
+IPO_KEYWORDS = ['ipo', 'bullish', 'blsh', 'rivn', 'lcid', 'hood', 'coin', 'rblx']
+
+
+def ticker_patterns(tickers):
+    """Whole-word pattern per ticker ($TSLA and TSLA are the same mention)"""
+    return {ticker: rf'\b{re.escape(ticker)}\b' for ticker in tickers}
+
+
+def keyword_patterns(keywords):
+    """Plain substring pattern per keyword"""
+    return {keyword: re.escape(keyword) for keyword in keywords}
+
+
+def post_text(df, columns=TEXT_COLUMNS):
+    """Searchable text per post; a newline keeps matches from spanning columns"""
+    parts = [df[column].astype(object).fillna('').astype(str) for column in columns if column in df.columns]
+    if not parts:
+        return pd.Series('', index=df.index)
+    text = parts[0]
+    for part in parts[1:]:
+        text = text + '\n' + part
+    return text
+
+
+class MentionMatcher:
+    """Matches a labelled set of regex patterns against post text
+
+    Patterns are combined into one alternation, so they must not contain
+    capturing groups and should not overlap each other.
+    """
+
+    def __init__(self, patterns, flags=re.IGNORECASE, columns=TEXT_COLUMNS):
+        self.labels = np.array(list(patterns), dtype=object)
+        self.regex = '|'.join(f'(?P<m{i}>{pattern})' for i, pattern in enumerate(patterns.values()))
+        self.flags = flags
+        self.columns = columns
+
+    def mentions(self, df):
+        """One row per mention: post_id (row position in df) and label"""
+        if df.empty or not len(self.labels):
+            return pd.DataFrame({'post_id': pd.Series(dtype='int64'), 'label': pd.Series(dtype=object)})
+
+        text = post_text(df, self.columns).reset_index(drop=True)
+        matches = text.str.extractall(self.regex, flags=self.flags)
+        # Exactly one named group is set per match; its position is the label
+        which = matches.notna().to_numpy().argmax(axis=1)
+        return pd.DataFrame({
+            'post_id': matches.index.get_level_values(0).to_numpy(dtype='int64'),
+            'label': self.labels[which]
+        })
+
+    def summary(self, df, mentions=None):
+        """Mentions, distinct posts and bullish % per label, most mentioned first"""
+        if mentions is None:
+            mentions = self.mentions(df)
+        if mentions.empty:
+            return pd.DataFrame(columns=['mentions', 'posts', 'bullish_pct'])
+
+        counts = mentions.groupby('label', sort=False).size()
+        pairs = mentions.drop_duplicates()
+        if 'sentiment_label' in df.columns:
+            bullish = df['sentiment_label'].isin(BULLISH_LABELS).to_numpy()[pairs['post_id'].to_numpy()]
+        else:
+            bullish = np.zeros(len(pairs), dtype=bool)
+        per_post = pairs.assign(bullish=bullish).groupby('label', sort=False)['bullish']
+
+        summary = pd.DataFrame({
+            'mentions': counts,
+            'posts': per_post.size(),
+            'bullish_pct': per_post.mean() * 100
+        })
+        # Stable sort keeps first-mentioned order among ties
+        return summary.sort_values('mentions', ascending=False, kind='stable')
+
+    def matching_rows(self, df, label=None, mentions=None):
+        """Rows of df that mention label (or any pattern when label is None)"""
+        if mentions is None:
+            mentions = self.mentions(df)
+        if label is not None:
+            mentions = mentions[mentions['label'] == label]
+        return df.iloc[np.unique(mentions['post_id'].to_numpy())]
+
+
+class MentionIndex:
+    """Post x label membership matrix built from a single matcher pass"""
+
+    def __init__(self, matcher, df):
+        self.labels = list(matcher.labels)
+        self._codes = {label: i for i, label in enumerate(self.labels)}
+        mentions = matcher.mentions(df)
+        self.matrix = np.zeros((len(df), len(self.labels)), dtype=bool)
+        self.matrix[mentions['post_id'].to_numpy(), mentions['label'].map(self._codes).to_numpy(dtype='int64')] = True
+
+    def positions(self, label=None):
+        """Row positions of posts mentioning label (or any label)"""
+        column = self.matrix.any(axis=1) if label is None else self.matrix[:, self._codes[label]]
+        return np.flatnonzero(column)
+
+    def rows(self, df, label=None):
+        """Rows of the indexed frame mentioning label (or any label)"""
+        return df.iloc[self.positions(label)]
+
+    def counts(self, mask=None):
+        """Matching posts per label, optionally restricted to a row mask"""
+        matrix = self.matrix if mask is None else self.matrix[np.asarray(mask, dtype=bool)]
+        return pd.Series(matrix.sum(axis=0), index=self.labels)
+
+
+def mention_index(matcher, df):
+    """MentionIndex for a loader frame, reused while its dataset version is unchanged"""
+    return per_version(('mentions', id(matcher)), df, lambda frame: MentionIndex(matcher, frame))
+
+
+TICKER_MATCHER = MentionMatcher(ticker_patterns(TRENDING_TICKERS))
+TESLA_MATCHER = MentionMatcher(keyword_patterns(TESLA_KEYWORDS))
+STOCK_MATCHER = MentionMatcher(STOCK_PATTERNS)
+IPO_MATCHER = MentionMatcher(keyword_patterns(IPO_KEYWORDS))
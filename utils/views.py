@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Derived frame views
+Cheap, non-mutating derivations of the shared frames returned by DataLoader
+"""
+
+import pandas as pd
+
+SENTIMENT_CATEGORY_MAP = {
+    '1 star': 'Bearish', '2 stars': 'Bearish', '3 stars': 'Neutral',
+    '4 stars': 'Bullish', '5 stars': 'Bullish'
+}
+
+
+def rows_between(df, start=None, end=None, column='timestamp'):
+    """Rows in [start, end), sliced by binary search on the loader's sort order"""
+    if df.empty or column not in df.columns:
+        return df
+    times = df[column]
+    if not times.is_monotonic_increasing:
+        # Unsorted or NaT-bearing columns fall back to a boolean mask
+        mask = times.notna()
+        if start is not None:
+            mask &= times >= start
+        if end is not None:
+            mask &= times < end
+        return df[mask]
+    lo = times.searchsorted(pd.Timestamp(start), side='left') if start is not None else 0
+    hi = times.searchsorted(pd.Timestamp(end), side='left') if end is not None else len(df)
+    return df.iloc[lo:hi]
+
+
+def rows_since(df, cutoff, column='timestamp'):
+    """Rows at or after cutoff"""
+    return rows_between(df, start=cutoff, column=column)
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Write-behind vote queue
+Votes are spooled to local disk and acknowledged at once; a background worker
+flushes them to S3 in per-tally batches, backing off while S3 is unreachable
+"""
+
+import json
+import os
+import threading
+import time
+import uuid
+from datetime import datetime
+from utils.s3_manifest import CACHE_DIR
+
+FLUSH_INTERVAL_SECONDS = 2   # Worker wake-up period while healthy
+FLUSH_BATCH = 20             # Pending votes that trigger an early flush
+MAX_BACKOFF_SECONDS = 300    # Longest wait between attempts while flushes fail
+MAINTAIN_INTERVAL_SECONDS = 300  # Period of the writer's maintenance hook
+MAX_ATTEMPTS = 10            # Failed writes of a vote before it is dead-lettered
+
+_registry_lock = threading.Lock()
+_queues = {}
+
+
+def get_vote_queue(bucket_name, write_batch, maintain=None):
+    """Return the shared vote queue for a bucket
+
+    write_batch(tally, votes) must store the votes or raise; maintain(), if
+    given, is run by the worker every MAINTAIN_INTERVAL_SECONDS. The first
+    caller's callbacks are used for the life of the process.
+    """
+    with _registry_lock:
+        if bucket_name not in _queues:
+            root = os.path.join(CACHE_DIR, 'vote_spool', str(bucket_name))
+            _queues[bucket_name] = VoteQueue(root, write_batch, maintain)
+        return _queues[bucket_name]
+
+
+def vote_queues():
+    """Queues created in this process, by bucket (for the debug page)"""
+    with _registry_lock:
+        return dict(_queues)
+
+
+class VoteQueue:
+    def __init__(self, root, write_batch, maintain=None):
+        self.root = root
+        self.write_batch = write_batch
+        self.maintain = maintain
+        self.dead_letter_root = os.path.join(root, 'dead_letter')
+        os.makedirs(self.dead_letter_root, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._pending = {}  # vote id -> vote
+        self.stats = {
+            'queued': 0, 'flushed': 0, 'failed_flushes': 0, 'dead_lettered': 0, 'last_flush': None,
+            'last_error': None, 'last_maintenance': None
+        }
+
+        # Votes spooled by a previous process are sent first
+        self._recover()
+        self._worker = threading.Thread(target=self._run, name='vote-queue', daemon=True)
+        self._worker.start()
+
+    def _path(self, vote_id, root=None):
+        return os.path.join(root or self.root, f"{vote_id}.json")
+
+    def spool(self, vote, root=None):
+        """Write a vote to disk durably (atomic replace after fsync)
+
+        Also called by the writer once a vote's log key is known.
+        """
+        path = self._path(vote['id'], root)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(vote, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def _recover(self):
+        for name in sorted(os.listdir(self.root)):
+            if name.endswith('.json.tmp'):
+                # Torn write from a crash before the replace; never acknowledged
+                try:
+                    os.remove(os.path.join(self.root, name))
+                except FileNotFoundError:
+                    pass
+                continue
+            if not name.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(self.root, name)) as f:
+                    vote = json.load(f)
+            except (OSError, ValueError):
+                continue  # Unreadable; left on disk for inspection
+            self._pending[vote['id']] = vote
+
+    def submit(self, tally, sentiment, session_id):
+        """Spool one vote and return immediately; S3 is written by the worker"""
+        vote = {
+            'id': uuid.uuid4().hex,
+            'tally': tally,
+            'sentiment': sentiment,
+            'session_id': session_id,
+            'timestamp': datetime.utcnow().isoformat(),
+            'log_key': None
+        }
+        self.spool(vote)
+        with self._lock:
+            self._pending[vote['id']] = vote
+            self.stats['queued'] += 1
+            backlog = len(self._pending)
+        if backlog >= FLUSH_BATCH:
+            self._wake.set()
+        return vote
+
+    def pending(self, tally):
+        """Bullish/bearish counts of votes for a tally not yet stored in S3"""
+        counts = {'bullish': 0, 'bearish': 0}
+        with self._lock:
+            for vote in self._pending.values():
+                if vote['tally'] == tally:
+                    counts[vote['sentiment']] += 1
+        return counts
+
+    def backlog(self):
+        with self._lock:
+            return len(self._pending)
+
+    def flush(self):
+        """Send all pending votes, one batch per tally; True if none are left over"""
+        with self._flush_lock:
+            with self._lock:
+                batches = {}
+                for vote in self._pending.values():
+                    batches.setdefault(vote['tally'], []).append(vote)
+
+            ok = True
+            for tally, votes in batches.items():
+                try:
+                    self.write_batch(tally, votes)
+                except Exception as e:
+                    ok = False
+                    with self._lock:
+                        self.stats['failed_flushes'] += 1
+                        self.stats['last_error'] = f"{tally}: {e}"
+                    self._record_failure(votes, f"{type(e).__name__}: {e}")
+                    continue
+
+                for vote in votes:
+                    try:
+                        os.remove(self._path(vote['id']))
+                    except FileNotFoundError:
+                        pass
+                with self._lock:
+                    for vote in votes:
+                        self._pending.pop(vote['id'], None)
+                    self.stats['flushed'] += len(votes)
+                    self.stats['last_flush'] = datetime.utcnow().isoformat()
+            return ok
+
+    def _record_failure(self, votes, error):
+        """Count a failed write against each vote, dead-lettering those out of attempts"""
+        for vote in votes:
+            vote['attempts'] = vote.get('attempts', 0) + 1
+            vote['last_error'] = error
+            if vote['attempts'] < MAX_ATTEMPTS:
+                self.spool(vote)
+                continue
+            # A batch that keeps failing (bad tally name, AccessDenied) must not retry forever
+            self.spool(vote, self.dead_letter_root)
+            try:
+                os.remove(self._path(vote['id']))
+            except FileNotFoundError:
+                pass
+            with self._lock:
+                self._pending.pop(vote['id'], None)
+                self.stats['dead_lettered'] += 1
+
+    def dead_letters(self):
+        """Votes that ran out of write attempts, oldest first (for the debug page)"""
+        votes = []
+        for name in sorted(os.listdir(self.dead_letter_root)):
+            if not name.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(self.dead_letter_root, name)) as f:
+                    votes.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        return sorted(votes, key=lambda vote: vote['timestamp'])
+
+    def retry_dead_letters(self):
+        """Queue every dead-lettered vote again with fresh attempts; returns how many"""
+        votes = self.dead_letters()
+        for vote in votes:
+            vote['attempts'] = 0
+            self.spool(vote)
+            os.remove(self._path(vote['id'], self.dead_letter_root))
+            with self._lock:
+                self._pending[vote['id']] = vote
+        if votes:
+            self._wake.set()
+        return len(votes)
+
+    def _run(self):
+        failures = 0
+        next_maintenance = time.monotonic()
+        while True:
+            deadline = time.monotonic() + min(FLUSH_INTERVAL_SECONDS * 2 ** failures, MAX_BACKOFF_SECONDS)
+            while True:
+                self._wake.wait(timeout=max(deadline - time.monotonic(), 0))
+                self._wake.clear()
+                # A full batch flushes early only while S3 is healthy
+                if not failures or time.monotonic() >= deadline:
+                    break
+            if self.maintain and time.monotonic() >= next_maintenance:
+                next_maintenance = time.monotonic() + MAINTAIN_INTERVAL_SECONDS
+                self._maintain()
+            if not self.backlog():
+                continue
+            try:
+                ok = self.flush()
+            except Exception as e:
+                # e.g. the spool disk failing; the worker must outlive it
+                ok = False
+                with self._lock:
+                    self.stats['failed_flushes'] += 1
+                    self.stats['last_error'] = str(e)
+            failures = 0 if ok else min(failures + 1, 16)
+
+    def _maintain(self):
+        try:
+            self.maintain()
+        except Exception as e:
+            with self._lock:
+                self.stats['last_error'] = f"maintenance: {e}"
+            return
+        with self._lock:
+            self.stats['last_maintenance'] = datetime.utcnow().isoformat()
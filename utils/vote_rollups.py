@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Vote rollups
+Hourly and daily bullish/bearish counts per vote tally, read from the vote
+log's keys alone and extended past a per-tally watermark by the vote queue
+worker; each tally's rollups are one small Parquet file in the local cache
+that pages only read
+"""
+
+import json
+import os
+import threading
+import time
+from urllib.parse import quote
+import pandas as pd
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+from botocore.exceptions import ClientError
+from utils.s3_fetcher import get_s3_client
+from utils.s3_manifest import CACHE_DIR
+from utils.voting_system import (
+    COMPACT_GRACE_SECONDS, LEGACY_PREFIX, LOG_PREFIX, SNAPSHOT_VERSION, log_tallies, parse_log_key, tally_name
+)
+
+ROLLUP_INTERVALS = {'1h': 'h', '1d': 'D'}
+ROLLUP_COLUMNS = ['time', 'bullish', 'bearish']
+
+_registry_lock = threading.Lock()
+_rollups = {}
+
+
+def get_vote_rollups(bucket_name):
+    """Return the shared vote rollups for a bucket"""
+    with _registry_lock:
+        if bucket_name not in _rollups:
+            _rollups[bucket_name] = VoteRollups(os.path.join(CACHE_DIR, 'vote_rollups', str(bucket_name)), bucket_name)
+        return _rollups[bucket_name]
+
+
+def vote_rollup(category, symbol=None, interval='1h'):
+    """Time-sorted time/bullish/bearish counts of a category/symbol per interval bucket, as last rolled up"""
+    return get_vote_rollups(os.getenv('S3_BUCKET_NAME')).rollup(tally_name(category, symbol), interval)
+
+
+def empty_rollup():
+    return pd.DataFrame({
+        'time': pd.Series(dtype='datetime64[ns, UTC]'),
+        'bullish': pd.Series(dtype='int32'),
+        'bearish': pd.Series(dtype='int32')
+    })
+
+
+def count_votes(times, bullish, freq):
+    """Bullish/bearish counts per freq bucket of UTC epoch-nanosecond vote times"""
+    votes = pd.DataFrame({
+        'time': pd.to_datetime(times, unit='ns', utc=True).floor(freq),
+        'bullish': bullish.astype('int32'),
+        'bearish': (~bullish).astype('int32')
+    })
+    return votes.groupby('time', as_index=False).sum()
+
+
+class VoteRollups:
+    """Rollups for every tally, updated from log keys past each tally's watermark
+
+    Log keys carry the submission time and sentiment, so updates only LIST
+    the log; votes are bucketed by when they were cast, not when they were
+    flushed, so a vote that waited in the queue lands in an earlier bucket.
+    The watermark lives in the Parquet file's metadata, so counts and
+    watermark are always replaced together.
+    """
+
+    def __init__(self, root, bucket_name, client=None):
+        self.root = root
+        self.bucket_name = bucket_name
+        self.s3_client = client or get_s3_client()
+        self.lock = threading.Lock()
+        self._tallies = {}  # tally -> (watermark, {interval: frame})
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, tally):
+        return os.path.join(self.root, f"{quote(tally, safe='')}.parquet")
+
+    def _read(self, tally):
+        """Saved watermark and rollups, or None if the tally was never rolled up"""
+        try:
+            table = pq.read_table(self._path(tally))
+        except (OSError, pa.ArrowInvalid):
+            return None
+        watermark = json.loads(table.schema.metadata[b'vote_rollup'])['watermark']
+        saved = table.to_pandas()
+        frames = {}
+        for interval in ROLLUP_INTERVALS:
+            rows = saved[saved['interval'] == interval][ROLLUP_COLUMNS]
+            frames[interval] = rows.sort_values('time').reset_index(drop=True)
+        return watermark, frames
+
+    def _write(self, tally, watermark, frames):
+        rows = pd.concat(
+            [frame.assign(interval=interval) for interval, frame in frames.items()], ignore_index=True
+        )
+        rows['interval'] = rows['interval'].astype('category')
+        table = pa.Table.from_pandas(rows, preserve_index=False)
+        metadata = dict(table.schema.metadata or {})
+        metadata[b'vote_rollup'] = json.dumps({'watermark': watermark}).encode('utf-8')
+        path = self._path(tally)
+        tmp_path = f"{path}.tmp"
+        pq.write_table(table.replace_schema_metadata(metadata), tmp_path)
+        os.replace(tmp_path, path)
+
+    def _legacy_votes(self, tally):
+        """(timestamp, sentiment) of votes kept in a pre-log vote document, if any"""
+        for key in (f"{LEGACY_PREFIX}{tally}.json", f"votes/{tally}.json"):
+            try:
+                response = self.s3_client.get_object(Bucket=self.bucket_name, Key=key)
+            except ClientError as e:
+                if e.response['Error']['Code'] in ('NoSuchKey', '404'):
+                    continue
+                raise
+            data = json.loads(response['Body'].read().decode('utf-8'))
+            if data.get('version') == SNAPSHOT_VERSION:
+                continue  # Already a counter snapshot; its history is in the log
+            return [
+                (vote['timestamp'], vote.get('sentiment') == 'bullish')
+                for vote in data.get('votes', []) if vote.get('timestamp')
+            ]
+        return []
+
+    def _new_votes(self, tally, watermark):
+        """Submission times and sentiments of log entries past the watermark and older than the grace period"""
+        prefix = f"{LOG_PREFIX}{tally}/"
+        cutoff = f"{prefix}{time.time_ns() - COMPACT_GRACE_SECONDS * 1_000_000_000:020d}"
+        times, bullish = [], []
+
+        paginator = self.s3_client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self.bucket_name, Prefix=prefix, StartAfter=watermark or prefix):
+            keys = [entry['Key'] for entry in page.get('Contents', [])]
+            done = bool(keys) and keys[-1] > cutoff
+            for key in keys:
+                if key > cutoff:
+                    break
+                _, sentiment, submitted = parse_log_key(prefix, key)
+                times.append(submitted)
+                bullish.append(sentiment == 'bullish')
+                watermark = key
+            if done:
+                break
+        return times, bullish, watermark
+
+    def update(self, tally):
+        """Fold log entries written since the last update into the tally's rollups"""
+        with self.lock:
+            saved = self._tallies.get(tally) or self._read(tally)
+            if saved is None:
+                # First rollup of this tally: start from any legacy vote list
+                legacy = self._legacy_votes(tally)
+                watermark = ''
+                frames = {interval: empty_rollup() for interval in ROLLUP_INTERVALS}
+                times = [pd.Timestamp(stamp, tz='UTC').value for stamp, _ in legacy]
+                bullish = [is_bullish for _, is_bullish in legacy]
+            else:
+                watermark, frames = saved
+                times, bullish = [], []
+
+            new_times, new_bullish, new_watermark = self._new_votes(tally, watermark)
+            times += new_times
+            bullish += new_bullish
+
+            if saved is None or times:
+                times = np.asarray(times, dtype='int64')
+                bullish = np.asarray(bullish, dtype='bool')
+                for interval, freq in ROLLUP_INTERVALS.items():
+                    # The newest existing bucket may still be filling up, so merge by time
+                    combined = pd.concat([frames[interval], count_votes(times, bullish, freq)], ignore_index=True)
+                    frames[interval] = combined.groupby('time', as_index=False).sum().astype(
+                        {'bullish': 'int32', 'bearish': 'int32'}
+                    )
+                self._write(tally, new_watermark, frames)
+
+            self._tallies[tally] = (new_watermark, frames)
+            return frames
+
+    def update_all(self, tallies=None):
+        """Update the given tallies, or every tally that has a vote log"""
+        if tallies is None:
+            tallies = log_tallies(self.s3_client, self.bucket_name)
+        for tally in tallies:
+            self.update(tally)
+        return tallies
+
+    def rollup(self, tally, interval='1h'):
+        """Counts per interval bucket as of the last update; never touches S3
+
+        Takes no lock, so a page never waits on an update's log listing.
+        """
+        saved = self._tallies.get(tally)
+        if saved is None:
+            saved = self._read(tally)
+            if saved is None:
+                return empty_rollup()
+            # An update that finished meanwhile has the newer counts
+            saved = self._tallies.setdefault(tally, saved)
+        return saved[1][interval].copy(deep=False)
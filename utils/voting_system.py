@@ -1,89 +1,387 @@
 #!/usr/bin/env python3
 """
 Simple voting system for sentiment gauges
-Stores votes in S3 as JSON files
+Every vote is an append-only S3 log object; a small per-tally counter
+snapshot is updated with conditional writes and periodically folded
+against the log, so reading totals is one small GET; pages load all their
+tallies in one concurrent batch through a short-TTL cache, and new votes go
+through a write-behind queue so clicks never wait on S3
 """
 
-import boto3
 import json
+import random
 import streamlit as st
-from datetime import datetime
+import threading
+import time
+import uuid
+from botocore.exceptions import ClientError
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
 import os
+from utils.s3_fetcher import DEFAULT_CONCURRENCY, get_s3_client
+from utils.vote_queue import get_vote_queue
+
+LOG_PREFIX = 'votes/log/'
+LEGACY_PREFIX = 'votes/legacy/'
+SNAPSHOT_VERSION = 2
+
+CAS_RETRIES = 5            # Snapshot update attempts per batch of votes
+COMPACT_AFTER = 100        # Applied log keys kept in the snapshot before folding
+FOLD_INTERVAL_SECONDS = 300  # Longest time between folds while votes keep arriving
+# Log entries younger than this are left for the next fold or rollup. Keys are
+# stamped before their PUT, so this must exceed the longest a PUT can take (5
+# attempts under the client's 10s/30s timeouts, about 4 minutes) plus clock
+# skew between writers; a key landing behind a watermark would never be counted
+COMPACT_GRACE_SECONDS = 900
+TALLY_TTL_SECONDS = 15      # How long loaded totals are reused across reruns
+
+# Error codes S3 uses when If-Match/If-None-Match does not hold
+CONFLICT_CODES = {'PreconditionFailed', 'ConditionalRequestConflict', '412', '409'}
+
+
+class SnapshotConflict(Exception):
+    """Every conditional snapshot update of a batch lost to another writer"""
+
+
+def tally_name(category, symbol=None):
+    """Name of the tally a vote counts towards"""
+    return f"{category}_{symbol}" if symbol else category
+
+
+def log_tallies(s3_client, bucket_name):
+    """Every tally that has a vote log"""
+    paginator = s3_client.get_paginator('list_objects_v2')
+    return [
+        common['Prefix'][len(LOG_PREFIX):-1]
+        for page in paginator.paginate(Bucket=bucket_name, Prefix=LOG_PREFIX, Delimiter='/')
+        for common in page.get('CommonPrefixes', [])
+    ]
+
+
+def submitted_ns(vote):
+    """UTC epoch nanoseconds of a vote's submission (its naive UTC ISO timestamp)"""
+    return (datetime.fromisoformat(vote['timestamp']) - datetime(1970, 1, 1)) // timedelta(microseconds=1) * 1000
+
+
+def parse_log_key(prefix, key):
+    """(order stamp, sentiment, submission time ns) of a vote log key
+
+    Keys written before the submission time was added carry only the
+    write time, which stands in for it.
+    """
+    parts = key[len(prefix):].split('-')
+    submitted = parts[2] if len(parts) > 3 else parts[0]
+    return int(parts[0]), parts[1], int(submitted)
+
+
+def empty_snapshot():
+    return {'version': SNAPSHOT_VERSION, 'bullish': 0, 'bearish': 0, 'watermark': '', 'applied': [], 'folded_at': 0}
+
+
+_tally_lock = threading.Lock()
+_tallies = {}  # tally -> (loaded_at, {'bullish', 'bearish'})
+
+
+def _remember_tally(tally, votes, loaded_at):
+    """Cache totals unless a newer load or write already did"""
+    with _tally_lock:
+        cached = _tallies.get(tally)
+        if cached is None or cached[0] <= loaded_at:
+            _tallies[tally] = (loaded_at, votes)
+
+
+def _forget_tally(tally):
+    with _tally_lock:
+        _tallies.pop(tally, None)
+
 
 class VotingSystem:
     def __init__(self):
-        self.s3_client = boto3.client('s3')
+        self.s3_client = get_s3_client()
         self.bucket_name = os.getenv('S3_BUCKET_NAME')
-    
-    def load_votes(self, category, symbol=None):
-        """Load existing votes for a category/symbol"""
-        key = f"votes/{category}_{symbol}.json" if symbol else f"votes/{category}.json"
-        
+        self.queue = get_vote_queue(self.bucket_name, self.write_votes, self.maintain)
+
+    def _snapshot_key(self, tally):
+        return f"votes/{tally}.json"
+
+    def _log_prefix(self, tally):
+        return f"{LOG_PREFIX}{tally}/"
+
+    def _read_snapshot(self, tally):
+        """Counter snapshot and its ETag (None if it does not exist yet)"""
         try:
-            response = self.s3_client.get_object(Bucket=self.bucket_name, Key=key)
-            return json.loads(response['Body'].read().decode('utf-8'))
-        except:
-            return {"bullish": 0, "bearish": 0, "votes": []}
-    
-    def save_vote(self, category, sentiment, symbol=None):
-        """Save a new vote"""
-        votes_data = self.load_votes(category, symbol)
-        
-        # Add vote
-        if sentiment == "bullish":
-            votes_data["bullish"] += 1
-        else:
-            votes_data["bearish"] += 1
-        
-        # Store vote details
-        votes_data["votes"].append({
-            "sentiment": sentiment,
-            "timestamp": datetime.utcnow().isoformat(),
-            "session_id": st.session_state.get("session_id", "anonymous")
-        })
-        
-        # Save to S3
-        key = f"votes/{category}_{symbol}.json" if symbol else f"votes/{category}.json"
+            response = self.s3_client.get_object(Bucket=self.bucket_name, Key=self._snapshot_key(tally))
+        except ClientError as e:
+            if e.response['Error']['Code'] in ('NoSuchKey', '404'):
+                return empty_snapshot(), None
+            raise
+        data = json.loads(response['Body'].read().decode('utf-8'))
+        etag = response['ETag']
+
+        if data.get('version') != SNAPSHOT_VERSION:
+            # Legacy document: its counts seed the snapshot, its vote list is archived on first write
+            snapshot = empty_snapshot()
+            snapshot['bullish'] = data.get('bullish', 0)
+            snapshot['bearish'] = data.get('bearish', 0)
+            snapshot['legacy_votes'] = data.get('votes', [])
+            return snapshot, etag
+        return data, etag
+
+    def _put_snapshot(self, tally, snapshot, etag):
+        """Conditionally write the snapshot; False if another writer got there first"""
+        legacy_votes = snapshot.pop('legacy_votes', None)
+        if legacy_votes is not None:
+            self._archive_legacy(tally, legacy_votes)
+
+        condition = {'IfMatch': etag} if etag else {'IfNoneMatch': '*'}
+        try:
+            self.s3_client.put_object(
+                Bucket=self.bucket_name,
+                Key=self._snapshot_key(tally),
+                Body=json.dumps(snapshot, separators=(',', ':')),
+                ContentType='application/json',
+                **condition
+            )
+            return True
+        except ClientError as e:
+            if e.response['Error']['Code'] in CONFLICT_CODES:
+                return False
+            raise
+
+    def _archive_legacy(self, tally, votes):
+        """Keep a legacy document's vote list; only the first archive is kept"""
+        try:
+            self.s3_client.put_object(
+                Bucket=self.bucket_name,
+                Key=f"{LEGACY_PREFIX}{tally}.json",
+                Body=json.dumps({'votes': votes}, separators=(',', ':')),
+                ContentType='application/json',
+                IfNoneMatch='*'
+            )
+        except ClientError as e:
+            if e.response['Error']['Code'] not in CONFLICT_CODES:
+                raise
+
+    def _append_log(self, tally, vote):
+        """Write one vote as its own log object
+
+        Keys sort by write time and carry the sentiment and the submission
+        time, which can be much earlier when the vote waited in the queue.
+        """
+        key = (
+            f"{self._log_prefix(tally)}{time.time_ns():020d}-{vote['sentiment']}-"
+            f"{submitted_ns(vote):020d}-{uuid.uuid4().hex}.json"
+        )
         self.s3_client.put_object(
             Bucket=self.bucket_name,
             Key=key,
-            Body=json.dumps(votes_data, indent=2),
-            ContentType='application/json'
+            Body=json.dumps({
+                'sentiment': vote['sentiment'],
+                'timestamp': vote['timestamp'],
+                'session_id': vote['session_id']
+            }, separators=(',', ':')),
+            ContentType='application/json',
+            IfNoneMatch='*'
         )
-        
-        return votes_data
-    
-    def render_voting_widget(self, category, symbol=None, label="Community Sentiment"):
-        """Render voting buttons and results"""
-        votes_data = self.load_votes(category, symbol)
-        
+        return key
+
+    def _grace_cutoff(self, tally):
+        """Log keys sorting after this are still inside the grace period"""
+        return f"{self._log_prefix(tally)}{time.time_ns() - COMPACT_GRACE_SECONDS * 1_000_000_000:020d}"
+
+    def _fold_log(self, tally, snapshot):
+        """Count log entries past the watermark that no snapshot update has applied yet"""
+        prefix = self._log_prefix(tally)
+        cutoff = self._grace_cutoff(tally)
+        applied = set(snapshot['applied'])
+        watermark = snapshot['watermark']
+
+        paginator = self.s3_client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self.bucket_name, Prefix=prefix, StartAfter=watermark or prefix):
+            for entry in page.get('Contents', []):
+                key = entry['Key']
+                if key > cutoff:
+                    break
+                if key in applied:
+                    applied.discard(key)
+                else:
+                    _, sentiment, _ = parse_log_key(prefix, key)
+                    snapshot['bullish' if sentiment == 'bullish' else 'bearish'] += 1
+                watermark = key
+            else:
+                continue
+            break
+
+        snapshot['watermark'] = watermark
+        # Keys at or before the watermark are now part of the counts
+        snapshot['applied'] = sorted(key for key in applied if key > watermark)
+        snapshot['folded_at'] = int(time.time())
+        return snapshot
+
+    def load_votes(self, category, symbol=None):
+        """Load vote totals for a category/symbol"""
+        return self.load_tallies(category, [symbol])[symbol]
+
+    def load_tallies(self, category, symbols):
+        """Vote totals for many symbols of a category, fetched concurrently
+
+        Totals younger than TALLY_TTL_SECONDS are reused; the rest are
+        fetched together, so a page pays at most one round of GETs per rerun.
+        """
+        symbols = list(dict.fromkeys(symbols))
+        now = time.monotonic()
+        votes = {}
+        with _tally_lock:
+            for symbol in symbols:
+                cached = _tallies.get(tally_name(category, symbol))
+                if cached is not None and now - cached[0] < TALLY_TTL_SECONDS:
+                    votes[symbol] = cached[1]
+        missing = [symbol for symbol in symbols if symbol not in votes]
+
+        def load(symbol):
+            try:
+                snapshot, _ = self._read_snapshot(tally_name(category, symbol))
+            except Exception:
+                return None
+            return {"bullish": snapshot['bullish'], "bearish": snapshot['bearish']}
+
+        if missing:
+            with ThreadPoolExecutor(max_workers=min(DEFAULT_CONCURRENCY, len(missing))) as executor:
+                loaded = list(executor.map(load, missing))
+            for symbol, result in zip(missing, loaded):
+                if result is None:
+                    # Failed reads show as no votes and are retried on the next rerun
+                    votes[symbol] = {"bullish": 0, "bearish": 0}
+                else:
+                    _remember_tally(tally_name(category, symbol), result, now)
+                    votes[symbol] = result
+
+        # Votes still in the write-behind queue are shown optimistically
+        return {symbol: self._with_queued(tally_name(category, symbol), votes[symbol]) for symbol in symbols}
+
+    def _with_queued(self, tally, votes):
+        """Totals plus the tally's votes still in the write-behind queue"""
+        queued = self.queue.pending(tally)
+        return {"bullish": votes["bullish"] + queued['bullish'], "bearish": votes["bearish"] + queued['bearish']}
+
+    def save_vote(self, category, sentiment, symbol=None):
+        """Queue a new vote; it is spooled locally and written to S3 in the background
+
+        Returns the cached totals (whatever their age) plus queued votes, so
+        a click never waits on an S3 read.
+        """
+        sentiment = "bullish" if sentiment == "bullish" else "bearish"
+        tally = tally_name(category, symbol)
+        self.queue.submit(tally, sentiment, st.session_state.get("session_id", "anonymous"))
+        with _tally_lock:
+            cached = _tallies.get(tally)
+        return self._with_queued(tally, cached[1] if cached else {"bullish": 0, "bearish": 0})
+
+    def write_votes(self, tally, votes):
+        """Store a batch of votes for one tally: log objects, then one snapshot update
+
+        Each vote's log key is recorded on it and spooled as soon as the
+        object exists, so retrying a failed batch, even after a restart,
+        never logs or counts a vote twice. Raises
+        SnapshotConflict when every snapshot update loses to another writer.
+        """
+        for vote in votes:
+            if not vote.get('log_key'):
+                vote['log_key'] = self._append_log(tally, vote)
+                self.queue.spool(vote)
+
+        for attempt in range(CAS_RETRIES):
+            snapshot, etag = self._read_snapshot(tally)
+            # Fold on size once a fold can drop applied keys, and on age so log
+            # entries no update applied are counted soon after the grace period
+            applied = snapshot['applied']
+            if ((len(applied) + len(votes) > COMPACT_AFTER and min(applied, default='~') <= self._grace_cutoff(tally))
+                    or time.time() - snapshot.get('folded_at', 0) >= FOLD_INTERVAL_SECONDS):
+                snapshot = self._fold_log(tally, snapshot)
+
+            # Skip votes a fold or an earlier attempt of this batch already counted
+            applied = set(snapshot['applied'])
+            for vote in votes:
+                if vote['log_key'] > snapshot['watermark'] and vote['log_key'] not in applied:
+                    snapshot[vote['sentiment']] += 1
+                    snapshot['applied'].append(vote['log_key'])
+
+            if self._put_snapshot(tally, snapshot, etag):
+                break
+            # Another writer updated the snapshot; back off and retry on the new version
+            time.sleep(random.uniform(0, 0.05 * 2 ** attempt))
+        else:
+            # A fold now would skip these votes (they are inside the grace period), so the
+            # batch stays queued; its log keys keep the retry from counting any vote twice
+            _forget_tally(tally)
+            raise SnapshotConflict(f"snapshot update lost {CAS_RETRIES} times in a row")
+
+        totals = {"bullish": snapshot['bullish'], "bearish": snapshot['bearish']}
+        # Voters must not see totals from before their own votes once the queue drops them
+        _remember_tally(tally, totals, time.monotonic())
+        return totals
+
+    def maintain(self):
+        """Fold every tally's log into its snapshot and extend its rollups
+
+        Run periodically by the vote queue worker, so pages only read the
+        results.
+        """
+        # vote_rollups imports this module
+        from utils.vote_rollups import get_vote_rollups
+
+        tallies = log_tallies(self.s3_client, self.bucket_name)
+        for tally in tallies:
+            self.compact_votes(tally)
+        get_vote_rollups(self.bucket_name).update_all(tallies)
+
+    def compact_votes(self, tally):
+        """Fold a tally's vote log into its snapshot, so idle tallies count late log entries too"""
+        for attempt in range(CAS_RETRIES):
+            snapshot, etag = self._read_snapshot(tally)
+            watermark = snapshot['watermark']
+            snapshot = self._fold_log(tally, snapshot)
+            if etag and snapshot['watermark'] == watermark:
+                return None  # Nothing new to fold
+            if self._put_snapshot(tally, snapshot, etag):
+                votes = {"bullish": snapshot['bullish'], "bearish": snapshot['bearish']}
+                _remember_tally(tally, votes, time.monotonic())
+                return votes
+            time.sleep(random.uniform(0, 0.05 * 2 ** attempt))
+        return None
+
+    def render_voting_widget(self, category, symbol=None, label="Community Sentiment", votes_data=None):
+        """Render voting buttons and results (from votes_data when the page bulk-loaded it)"""
+        if votes_data is None:
+            votes_data = self.load_votes(category, symbol)
+
         # Check if user already voted (session-based)
         vote_key = f"voted_{category}_{symbol}"
         has_voted = st.session_state.get(vote_key, False)
-        
+
         total_votes = votes_data["bullish"] + votes_data["bearish"]
         bullish_pct = (votes_data["bullish"] / total_votes * 100) if total_votes > 0 else 50
-        
+
         col1, col2 = st.columns(2)
-        
+
         with col1:
             if st.button("🟢", key=f"bull_{category}_{symbol}", disabled=has_voted):
                 self.save_vote(category, "bullish", symbol)
                 st.session_state[vote_key] = True
                 st.rerun()
-        
+
         with col2:
             if st.button("🔴", key=f"bear_{category}_{symbol}", disabled=has_voted):
                 self.save_vote(category, "bearish", symbol)
                 st.session_state[vote_key] = True
                 st.rerun()
-        
+
         if total_votes > 0:
             st.caption(f"{bullish_pct:.0f}% bull ({total_votes})")
         else:
             st.caption("No votes")
-        
+
         if has_voted:
             st.caption("✅ Voted")
-        
-        return votes_data
\ No newline at end of file
+
+        return votes_data